@@ -22,6 +22,7 @@ if platform.system() == "Windows":
 
 # Now import asyncio normally (it's already imported above on Windows, but that's OK)
 import asyncio
+import hashlib
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
@@ -31,7 +32,18 @@ from typing import Optional, List, Dict, Any
 from contextlib import asynccontextmanager
 import uvicorn
 import os
+import re
 import time
+import logging
+import traceback
+
+# Optional multi-pattern matcher (pip install pyahocorasick); falls back to substring checks
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
 # Import shared utilities from service_mcp (browser management, LLM)
 try:
     import service_mcp
@@ -59,15 +71,59 @@ except ImportError as e:
     raise
 except Exception as e:
     print(f"Error importing from service_mcp: {e}")
-    import traceback
     traceback.print_exc()
     raise
 
+_NUMBER_RE = re.compile(r'\d+')
+_USER_URL_RE = re.compile(r'/u(?:ser)?/([^/]+)')
+
+# Phrases that suggest purchase intent, for keyword-based scoring when the LLM is unavailable
+_INTENT_KEYWORDS = ('recommend', 'recommendation', 'need', 'want', 'looking for', 'best', 'which', 'where to buy', 'help me find', 'seeking', 'searching for')
+_INTENT_KEYWORDS_SHORT = ('recommend', 'need', 'want', 'looking for', 'best', 'which', 'where to buy')
+
+def _build_keyword_automaton(keywords):
+    """Aho-Corasick automaton over keywords, or None without pyahocorasick"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+_INTENT_AUTOMATON = _build_keyword_automaton(_INTENT_KEYWORDS)
+_INTENT_AUTOMATON_SHORT = _build_keyword_automaton(_INTENT_KEYWORDS_SHORT)
+
+def _count_keywords(text_lower: str, keywords, automaton) -> int:
+    """Number of distinct keywords occurring in text_lower (one pass with an automaton)"""
+    if automaton is not None:
+        return len({keyword for _, keyword in automaton.iter(text_lower)})
+    return service_mcp.count_keyword_hits(text_lower, keywords)
+
+# Comments shorter than this skip intent scoring when nothing in them relates to the search
+_PREFILTER_MAX_LENGTH = 200
+_TOKEN_RE = re.compile(r'\w{4,}')
+
+def _keyword_tokens(text: str) -> frozenset:
+    """Lowercased words of 4+ characters in text"""
+    return frozenset(_TOKEN_RE.findall(text.lower()))
+
+def _may_have_intent(text: str, keyword_tokens: frozenset) -> bool:
+    """Cheap gate before LLM intent scoring: False only for short comments with no
+    search keyword, no intent phrase and no question"""
+    if len(text) >= _PREFILTER_MAX_LENGTH or '?' in text:
+        return True
+    text_lower = text.lower()
+    if not keyword_tokens.isdisjoint(_TOKEN_RE.findall(text_lower)):
+        return True
+    return _count_keywords(text_lower, _INTENT_KEYWORDS, _INTENT_AUTOMATON) > 0
+
 # Use lifespan context manager (replaces deprecated on_event)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
     # Startup
+    service_mcp.configure_logging()
     if platform.system() == "Windows":
         try:
             loop = asyncio.get_running_loop()
@@ -293,7 +349,6 @@ async def health():
 async def debug_imports():
     """Debug endpoint to check what functions are imported"""
     try:
-        import service_mcp
         return {
             "reddit_platform": {
                 "exists": hasattr(PlatformRegistry, 'get_platform'),
@@ -306,7 +361,7 @@ async def debug_imports():
             }
         }
     except Exception as e:
-        return {"error": str(e), "traceback": str(__import__('traceback').format_exc())}
+        return {"error": str(e), "traceback": traceback.format_exc()}
 
 @app.get("/api/browser-status", response_model=HealthResponse)
 async def browser_status():
@@ -359,7 +414,6 @@ async def login():
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         error_detail = f"Login failed: {str(e)}\nTraceback: {traceback.format_exc()}"
         raise HTTPException(status_code=500, detail=error_detail)
 
@@ -458,109 +512,16 @@ async def get_note_comments_endpoint(request: GetCommentsRequest):
 async def generate_comment(request: PostCommentRequest):
     """Generate a smart comment preview without posting"""
     try:
-        # Import the internal function to generate comment without posting
-        _generate_smart_comment = getattr(service_mcp, '_generate_smart_comment', None)
-        get_note_content_impl = getattr(service_mcp, 'get_note_content_impl', None)
-        
-        if not _generate_smart_comment or not callable(_generate_smart_comment):
-            raise HTTPException(status_code=500, detail="_generate_smart_comment not found")
-        
-        if not get_note_content_impl:
-            raise HTTPException(status_code=500, detail="get_note_content_impl not found")
-        
-        # Get post content - we need structured data (Title, Content, Author)
-        # The post_smart_comment function gets this data, so we'll replicate that logic
-        # For now, we'll use get_note_content_impl and parse it, or visit the page directly
-        # Actually, let's just visit the page and extract the data like post_smart_comment does
-        from service_mcp import ensure_browser, main_page
-        
-        login_status = await ensure_browser()
-        if not login_status:
-            raise HTTPException(status_code=400, detail="Please login to Reddit first")
-        
-        # Visit post link to get structured content
-        await main_page.goto(request.url, timeout=60000)
-        await asyncio.sleep(3)
-        
-        # Extract post content similar to post_smart_comment
-        post_content = {
-            "Title": "",
-            "Content": "",
-            "Author": ""
-        }
-        
-        # Get post title
-        try:
-            title_selectors = [
-                'h1[data-testid="post-title"]',
-                'h1',
-                '[data-testid="post-title"]',
-                'a[data-testid="post-title"]'
-            ]
-            for selector in title_selectors:
-                try:
-                    title_element = await main_page.query_selector(selector)
-                    if title_element:
-                        title = await title_element.text_content()
-                        if title and title.strip():
-                            post_content["Title"] = title.strip()
-                            break
-                except:
-                    continue
-        except:
-            pass
-        
-        # Get author
-        try:
-            author_selectors = [
-                'a[data-testid="post_author_link"]',
-                'a[href*="/user/"]',
-                'a[href*="/u/"]'
-            ]
-            for selector in author_selectors:
-                try:
-                    author_element = await main_page.query_selector(selector)
-                    if author_element:
-                        author = await author_element.text_content()
-                        if author and author.strip():
-                            post_content["Author"] = author.strip()
-                            break
-                except:
-                    continue
-        except:
-            pass
+        # Get Reddit platform instance
+        browser_context = getattr(service_mcp, 'browser_context', None)
+        main_page = getattr(service_mcp, 'main_page', None)
+        reddit_platform = PlatformRegistry.get_platform("reddit", browser_context=browser_context, main_page=main_page)
         
-        # Get post body content
+        # Extract the post on the browser loop and generate the comment text
         try:
-            content_selectors = [
-                'div[data-testid="post-content"]',
-                'div[data-testid="post-content"] p',
-                'article p',
-                'div.usertext-body'
-            ]
-            for selector in content_selectors:
-                try:
-                    content_elements = await main_page.query_selector_all(selector)
-                    if content_elements:
-                        content_parts = []
-                        for el in content_elements[:5]:  # Limit to first 5 paragraphs
-                            text = await el.text_content()
-                            if text and text.strip():
-                                content_parts.append(text.strip())
-                        if content_parts:
-                            post_content["Content"] = " ".join(content_parts)
-                            break
-                except:
-                    continue
-        except:
-            pass
-        
-        # If no content found, use title as content
-        if not post_content["Content"]:
-            post_content["Content"] = post_content["Title"] or "Post content"
-        
-        # Generate comment text
-        comment_text = await _generate_smart_comment(post_content, request.comment_type)
+            comment_text = await reddit_platform.generate_comment(request.url, request.comment_type)
+        except RuntimeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         return {
             "success": True,
@@ -570,7 +531,6 @@ async def generate_comment(request: PostCommentRequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         raise HTTPException(status_code=500, detail=f"Failed to generate comment: {str(e)}\n{traceback.format_exc()}")
 
 @app.post("/api/post-comment", response_model=PostCommentResponse)
@@ -592,7 +552,6 @@ async def post_comment(request: PostCommentRequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         raise HTTPException(status_code=500, detail=f"Failed to post comment: {str(e)}\n{traceback.format_exc()}")
 
 @app.post("/api/reply-comment", response_model=ReplyCommentResponse)
@@ -604,8 +563,9 @@ async def reply_comment(request: ReplyCommentRequest):
         main_page = getattr(service_mcp, 'main_page', None)
         reddit_platform = PlatformRegistry.get_platform("reddit", browser_context=browser_context, main_page=main_page)
         
-        result = await reddit_platform.reply_to_comment(request.url, request.comment_content, request.reply_text)
-        success = "success" in result.lower()
+        success, result = await reddit_platform.reply_to_comment_result(
+            request.url, request.comment_content, request.reply_text
+        )
         return {
             "success": success,
             "message": result
@@ -653,7 +613,6 @@ async def auto_promote(request: AutoPromoteRequest):
 async def get_platforms():
     """Get list of available platforms"""
     try:
-        from platforms.platform_registry import PlatformRegistry
         platforms = PlatformRegistry.get_available_platforms()
         return {
             "success": True,
@@ -681,35 +640,13 @@ async def analyze_product(request: AnalyzeProductRequest):
         keywords = await platform.generate_search_keywords(request.product_description)
         
         # Step 2: Search for posts using platform (pass product_description for relevance filtering)
-        search_result = await platform.search_posts(keywords, limit=5, product_description=request.product_description)
-        if not search_result or not isinstance(search_result, str) or "No posts found" in search_result:
-            return {
-                "success": True,
-                "leads": [],
-                "message": "No posts found matching the product description"
-            }
-        
-        # Parse search result string into list of dictionaries
-        # Format: "Search results:\n\n1. Title\n   Link: URL\n\n2. Title\n   Link: URL\n\n..."
-        posts = []
-        import re
-        lines = search_result.split('\n')
-        current_title = None
-        for line in lines:
-            line = line.strip()
-            # Match numbered title: "1. Title" or "1. "Title""
-            title_match = re.match(r'^\d+\.\s+(.+)$', line)
-            if title_match:
-                current_title = title_match.group(1).strip()
-                # Remove quotes if present
-                if current_title.startswith('"') and current_title.endswith('"'):
-                    current_title = current_title[1:-1]
-            # Match link: "Link: URL"
-            elif line.startswith('Link:') and current_title:
-                url = line.replace('Link:', '').strip()
-                if url and current_title:
-                    posts.append({'title': current_title, 'url': url})
-                    current_title = None
+        search_result = await platform.search_posts(
+            keywords, limit=5, product_description=request.product_description, structured=True
+        )
+        posts = [
+            {'title': post['title'], 'url': post['href']}
+            for post in (search_result if isinstance(search_result, list) else [])
+        ]
         
         if not posts:
             return {
@@ -718,6 +655,9 @@ async def analyze_product(request: AnalyzeProductRequest):
                 "message": "No posts found matching the product description"
             }
         
+        # Search keywords gate which comments are worth scoring (see _may_have_intent)
+        keyword_tokens = _keyword_tokens(keywords)
+        
         # Step 3: Process each post in parallel for better performance
         # Use asyncio to parallelize post processing
         async def process_single_post(i: int, post: dict, product_description: str) -> list:
@@ -730,20 +670,30 @@ async def analyze_product(request: AnalyzeProductRequest):
                 if not post_url:
                     return post_leads
                 
+                # Load the post's comments while its content loads (each uses its own pooled page)
+                comments_task = asyncio.ensure_future(platform.get_post_comments(post_url))
+                
                 # Get post content using platform
-                post_content_str = await platform.get_post_content(post_url)
+                try:
+                    post_content_str = await platform.get_post_content(post_url)
+                except BaseException:
+                    comments_task.cancel()
+                    raise
                 post_content = post_content_str if isinstance(post_content_str, str) else str(post_content_str)
                 
+                # Score the post while its comments load
+                intent_task = asyncio.ensure_future(_analyze_intent_score(post_content, product_description))
+                
                 # Get comments using platform
                 comments = []
                 try:
-                    comments = await platform.get_post_comments(post_url)
+                    comments = await comments_task
                 except Exception as e:
                     print(f"Error getting comments for {post_url}: {e}")
                     comments = []
                 
                 # Analyze intent for post content
-                intent_score = await _analyze_intent_score(post_content, product_description)
+                intent_score = await intent_task
                 
                 # Create lead for the post
                 post_leads.append({
@@ -760,49 +710,42 @@ async def analyze_product(request: AnalyzeProductRequest):
                     "type": "post"
                 })
                 
-                # Process comments in parallel for intent analysis
-                async def process_comment(j: int, comment: dict) -> Optional[dict]:
-                    """Process a single comment and return lead if intent is high enough"""
+                # Comments worth scoring; conversational noise ("thanks!", "same here")
+                # cannot reach the threshold (see _may_have_intent)
+                candidates = []
+                for j, comment in enumerate(comments[:10]):  # Limit to 10 comments per post
                     comment_content = comment.get('content', '') or comment.get('Content', '')
-                    comment_username = comment.get('username', '') or comment.get('Username', '')
-                    
-                    if not comment_content:
-                        return None
-                    
-                    # Analyze comment intent
-                    comment_intent = await _analyze_intent_score(comment_content, product_description)
-                    
-                    if comment_intent >= 40:  # Only include comments with reasonable intent
-                        # Create comment URL
-                        comment_url = post_url
-                        if '/comments/' in post_url:
-                            comment_url = post_url.split('?')[0] + f'#comment-{j}'
-                        
-                        return {
-                            "id": f"comment-{i}-{j}",
-                            "username": comment_username or "Unknown User",
-                            "platform": platform_name.capitalize(),
-                            "category": "LIFESTYLE NOTE",
-                            "date": comment.get('time', '') or comment.get('Time', ''),
-                            "title": "",
-                            "question": extract_question(comment_content),
-                            "content": comment_content,
-                            "url": comment_url,
-                            "intentScore": comment_intent,
-                            "type": "comment"
-                        }
-                    return None
+                    if comment_content and _may_have_intent(comment_content, keyword_tokens):
+                        candidates.append((j, comment, comment_content))
                 
-                # Process all comments in parallel
-                comment_tasks = [process_comment(j, comment) for j, comment in enumerate(comments[:10])]  # Limit to 10 comments per post
-                comment_results = await asyncio.gather(*comment_tasks, return_exceptions=True)
+                # Score all of the post's comments with one LLM request
+                comment_intents = await _analyze_intent_scores(
+                    [comment_content for _, _, comment_content in candidates], product_description
+                )
                 
-                # Collect valid comment leads
-                for result in comment_results:
-                    if isinstance(result, Exception):
+                for (j, comment, comment_content), comment_intent in zip(candidates, comment_intents):
+                    if comment_intent < 40:  # Only include comments with reasonable intent
                         continue
-                    if result is not None:
-                        post_leads.append(result)
+                    
+                    # Create comment URL
+                    comment_url = post_url
+                    if '/comments/' in post_url:
+                        comment_url = post_url.split('?')[0] + f'#comment-{j}'
+                    
+                    comment_username = comment.get('username', '') or comment.get('Username', '')
+                    post_leads.append({
+                        "id": f"comment-{i}-{j}",
+                        "username": comment_username or "Unknown User",
+                        "platform": platform_name.capitalize(),
+                        "category": "LIFESTYLE NOTE",
+                        "date": comment.get('time', '') or comment.get('Time', ''),
+                        "title": "",
+                        "question": extract_question(comment_content),
+                        "content": comment_content,
+                        "url": comment_url,
+                        "intentScore": comment_intent,
+                        "type": "comment"
+                    })
                 
             except Exception as e:
                 print(f"Error processing post {i}: {e}")
@@ -836,7 +779,6 @@ async def analyze_product(request: AnalyzeProductRequest):
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}\n{traceback.format_exc()}")
 
 async def _analyze_intent_score(text: str, product_description: str) -> int:
@@ -856,37 +798,77 @@ Respond with ONLY a number between 0 and 100 representing the intent score. High
             result = await _call_llm(prompt, system_prompt="You are an expert at analyzing purchase intent. Respond with only a number.")
             
             # Try to extract number from result
-            import re
-            numbers = re.findall(r'\d+', result)
-            if numbers:
-                score = int(numbers[0])
+            number = _NUMBER_RE.search(result)
+            if number:
+                score = int(number.group())
                 return min(100, max(0, score))
         
         # Fallback: simple keyword-based scoring
-        text_lower = text.lower()
-        score = 0
-        intent_keywords = ['recommend', 'recommendation', 'need', 'want', 'looking for', 'best', 'which', 'where to buy', 'help me find', 'seeking', 'searching for']
-        for keyword in intent_keywords:
-            if keyword in text_lower:
-                score += 15
-        if '?' in text:
-            score += 10
-        return min(100, max(20, score))
+        return _keyword_intent_score(text)
     except Exception as e:
         print(f"Error analyzing intent: {e}")
         # Fallback scoring
         text_lower = text.lower()
-        score = 0
-        intent_keywords = ['recommend', 'need', 'want', 'looking for', 'best', 'which', 'where to buy']
-        for keyword in intent_keywords:
-            if keyword in text_lower:
-                score += 15
+        score = 15 * _count_keywords(text_lower, _INTENT_KEYWORDS_SHORT, _INTENT_AUTOMATON_SHORT)
         return min(100, max(20, score))
 
+def _keyword_intent_score(text: str) -> int:
+    """Keyword-based intent score, for when the LLM is unavailable or gives no number"""
+    score = 15 * _count_keywords(text.lower(), _INTENT_KEYWORDS, _INTENT_AUTOMATON)
+    if '?' in text:
+        score += 10
+    return min(100, max(20, score))
+
+async def _analyze_intent_scores(texts: List[str], product_description: str) -> List[int]:
+    """Analyze intent scores for several texts with one LLM call (see _analyze_intent_score)"""
+    if not texts:
+        return []
+    
+    # Scores are cached per comment, keyed by the product (hashed once) and the
+    # normalized comment text; only the misses go to the LLM
+    product_key = hashlib.blake2b(
+        " ".join(product_description.split()).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    keys = [
+        hashlib.blake2b(
+            f"{product_key}::{' '.join(text.lower().split())}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        for text in texts
+    ]
+    scores = [service_mcp.intent_cache.get(key, service_mcp.LLM_CACHE_TTL) for key in keys]
+    missing = [k for k, score in enumerate(scores) if score is None]
+    if not missing:
+        return scores
+    
+    _call_llm_multi = getattr(service_mcp, '_call_llm_multi', None)
+    results = [""] * len(missing)
+    if _call_llm_multi and callable(_call_llm_multi):
+        try:
+            results = await _call_llm_multi(
+                [{"text": texts[k][:500]} for k in missing],
+                "Text to analyze: {text}",
+                system_prompt=f"""You are an expert at analyzing purchase intent. For each item, determine the purchase intent score (0-100) for this product:
+
+Product: {product_description}
+
+Each result is ONLY a number between 0 and 100 representing the intent score. Higher scores indicate stronger purchase intent.""",
+                max_tokens_per_item=10
+            )
+        except Exception as e:
+            logger.warning("Error analyzing intent: %s", e)
+    
+    for k, result in zip(missing, results):
+        number = _NUMBER_RE.search(result)
+        if number:
+            scores[k] = min(100, max(0, int(number.group())))
+            service_mcp.intent_cache.set(keys[k], scores[k])
+        else:
+            scores[k] = _keyword_intent_score(texts[k])
+    return scores
+
 def extract_username_from_url(url: str) -> Optional[str]:
     """Extract username from Reddit URL"""
-    import re
-    match = re.search(r'/u/([^/]+)', url) or re.search(r'/user/([^/]+)', url)
+    match = _USER_URL_RE.search(url)
     return match.group(1) if match else None
 
 def extract_question(text: str) -> str:
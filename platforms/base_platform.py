@@ -2,7 +2,7 @@
 Base platform interface for forum implementations
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from playwright.async_api import Page, BrowserContext
 
 
@@ -100,6 +100,18 @@ class BasePlatform(ABC):
         """
         pass
     
+    async def reply_to_comment_result(self, url: str, comment_content: str, reply_text: str) -> Tuple[bool, str]:
+        """Reply to a specific comment, reporting success separately from the message
+        
+        Platforms should override this. The default cannot tell whether
+        reply_to_comment succeeded, so it never reports success.
+        
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
+        message = await self.reply_to_comment(url, comment_content, reply_text)
+        return False, message
+    
     def get_search_url(self, keywords: str) -> str:
         """Generate search URL for the platform (can be overridden)"""
         base_url = self.get_base_url()
@@ -3,16 +3,243 @@ Reddit platform implementation - Self-contained Reddit-specific logic
 Uses service_mcp.py only for shared utilities (browser management, LLM)
 """
 from .base_platform import BasePlatform
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
 from playwright.async_api import BrowserContext, Page
 import asyncio
+import base64
+import json
+import logging
+import os
 import time
+import uuid
 import re
 import random
 
 # Import shared utilities from service_mcp
 import service_mcp
 
+# Optional fast HTML parser (pip install selectolax); falls back to Playwright queries
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser  # selectolax < 1.0
+    except ImportError:
+        HTMLParser = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds a logged-out result is trusted before ensure_browser checks the home page again
+LOGIN_RECHECK_SECONDS = float(os.getenv("LOGIN_RECHECK_SECONDS", "60"))
+
+# Optional Reddit API replies (script app from https://www.reddit.com/prefs/apps): with
+# REDDIT_API_REPLIES=true and credentials set, replies are posted with one API request
+# instead of driving the post page; the browser flow remains the fallback
+REDDIT_API_REPLIES = os.getenv("REDDIT_API_REPLIES", "false").lower() == "true"
+REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID", "")
+REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET", "")
+REDDIT_USERNAME = os.getenv("REDDIT_USERNAME", "")
+REDDIT_PASSWORD = os.getenv("REDDIT_PASSWORD", "")
+REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "LeadGenAI/1.0")
+
+# Search result post links; used both to wait for results and to extract them
+_POST_LINK_SELECTOR = 'a[href*="/r/"][href*="/comments/"]'
+
+def _join_selector(selectors) -> str:
+    """Join fallback selectors into one CSS selector group (matches in document order)"""
+    return ", ".join(selectors)
+
+# Post page selectors (fallbacks in priority order)
+_POST_TITLE_SELECTORS = (
+    'h1[data-testid="post-title"]',
+    'h1',
+    '[data-testid="post-title"]',
+    'a[data-testid="post-title"]'
+)
+_POST_AUTHOR_SELECTORS = (
+    'a[data-testid="post_author_link"]',
+    'a[href*="/user/"]',
+    'a[href*="/u/"]'
+)
+_POST_BODY_SELECTORS = (
+    'div[data-testid="post-content"]',
+    'div.md',
+    'article',
+    'div[data-testid="comment"]'
+)
+_CONTENT_SELECTORS = (
+    'div.content',
+    'div.note-content',
+    'article',
+    'div.desc'
+)
+# Present once the post has rendered
+_POST_READY_SELECTOR = _join_selector(_POST_TITLE_SELECTORS[:3])
+# Post is ready once a title renders or the page already holds substantial text,
+# whichever comes first (one in-page wait instead of a selector wait plus a sleep)
+_POST_READY_JS = "(selector) => !!document.querySelector(selector) || (document.body && document.body.innerText.length > 500)"
+# Class-token and attribute matches for comment containers outside shreddit-comment;
+# a [class*=...] substring match tests every element. Kept in sync with _EXTRACT_COMMENTS_JS
+_COMMENT_CLASS_SELECTORS = ('.Comment', '.comment', 'div[data-type="comment"]', '[data-testid="comment"]')
+# Present once the comment tree has started rendering
+_COMMENTS_READY_SELECTOR = _join_selector(('shreddit-comment',) + _COMMENT_CLASS_SELECTORS)
+
+# Comments are ready once one renders or the page has finished loading without any
+_COMMENTS_READY_JS = "(selector) => !!document.querySelector(selector) || document.readyState === 'complete'"
+
+# Every comment as {Username, Content, Time} in a single DOM walk. Modern Reddit renders
+# shreddit-comment elements (content may sit in a shadow root); older layouts fall back
+# to class-based comment containers
+_EXTRACT_COMMENTS_JS = '''
+    () => {
+        const text = (el) => (el && el.textContent ? el.textContent.trim() : "");
+        // Action-bar labels picked up when a comment's whole text is the only content
+        const uiTokens = /\\b(reply|share|report|save|permalink|context|give award)\\b/gi;
+        const comments = [];
+
+        // Tag-name lookup skips the selector engine for the common (new Reddit) case
+        let elements = document.getElementsByTagName('shreddit-comment');
+        const isNewReddit = elements.length > 0 || document.getElementsByTagName('shreddit-app').length > 0;
+        if (elements.length === 0) {
+            elements = document.querySelectorAll('.Comment, .comment, div[data-type="comment"], [data-testid="comment"]');
+        }
+        // Only pierce shadow roots when the page actually renders comments into them
+        const pierce = Array.prototype.some.call(elements, (el) => el.shadowRoot);
+        const query = pierce
+            ? (el, selector) => (el.shadowRoot && el.shadowRoot.querySelector(selector)) || el.querySelector(selector)
+            : (el, selector) => el.querySelector(selector);
+        for (const el of elements) {
+            // shreddit-comment carries the author as an attribute; only
+            // other layouts need a link lookup
+            const author = el.getAttribute('author') || text(
+                el.querySelector('a[href*="/user/"], a[href*="/u/"], [data-testid="comment_author_link"]')
+                || (pierce && el.shadowRoot && el.shadowRoot.querySelector('a[href*="/user/"], a[href*="/u/"]')));
+            const contentEl = query(el, '[data-testid="comment"], .md, p, .comment, div[data-type="comment"]');
+            const content = contentEl
+                ? text(contentEl)
+                : (author ? text(el).split(author).join('') : text(el)).replace(uiTokens, '').trim();
+            const timeEl = el.querySelector('time, [data-testid="comment_timestamp"]')
+                || (pierce && el.shadowRoot && el.shadowRoot.querySelector('time'));
+            const time = timeEl
+                ? (timeEl.getAttribute('title') || timeEl.getAttribute('datetime') || text(timeEl))
+                : "";
+            if (content.length > 10) {
+                comments.push({
+                    Username: author || "[deleted]",
+                    Content: content,
+                    Time: time.trim() || "Unknown time"
+                });
+            }
+        }
+        // New Reddit without matches has no comments; old-Reddit containers won't exist
+        if (comments.length > 0 || isNewReddit) return comments;
+
+        // Fallback: class-based selectors (old Reddit or alternative structure)
+        for (const el of document.querySelectorAll(':is(.comment, .Comment, div[data-type="comment"])')) {
+            const content = text(el.querySelector('.md, .usertext-body, p'));
+            const timeEl = el.querySelector('time, .live-timestamp');
+            const time = timeEl ? (timeEl.getAttribute('title') || text(timeEl)) : "";
+            if (content.length > 0) {
+                comments.push({
+                    Username: text(el.querySelector('a.author, a[class*="author"]')) || "[deleted]",
+                    Content: content,
+                    Time: time.trim() || "Unknown time"
+                });
+            }
+        }
+        return comments;
+    }
+'''
+# Defines the extractor on every page of the context, so pages call it by name instead
+# of receiving and compiling the source on each extraction
+_EXTRACT_COMMENTS_INIT_SCRIPT = f"window.__extractComments = {_EXTRACT_COMMENTS_JS.strip()};"
+_CALL_EXTRACT_COMMENTS_JS = "() => window.__extractComments ? window.__extractComments() : null"
+
+# Body text fallback: the longest text block that does not look like navigation or a
+# listing, found in a single pass (no filtered copy of the DOM, no sort)
+_LARGEST_TEXT_BLOCK_JS = '''
+    () => {
+        let best = null;
+        for (const el of document.querySelectorAll('div, p, article')) {
+            if (el.children.length >= 10) continue;
+            const text = el.textContent.trim();
+            if (text.length > 50 && text.length < 5000 && (best === null || text.length > best.length) &&
+                    el.querySelectorAll('a, button').length < 5) {
+                best = text;
+            }
+        }
+        return best;
+    }
+'''
+
+# Comment / reply form selectors. Attribute/structural CSS comes first; Playwright's
+# text engine (text=, :has-text) walks the whole page, so those are last resorts
+_COMMENT_INPUT_SELECTORS = (
+    '[placeholder*="Add a comment" i]',
+    '[aria-label*="Add a comment" i]',
+    '[placeholder*="What are your thoughts" i]',
+    'div[contenteditable="true"]',
+    'textarea[placeholder*="comment" i]',
+    'text="Add a comment..."',
+    'text="What are your thoughts?"'
+)
+_COMMENT_SUBMIT_SELECTORS = (
+    'button[slot="submit-button"]',
+    'button[data-testid="submit-button"]',
+    'form button[type="submit"]',
+    'button:has-text("Comment")',
+    'button:has-text("Post")'
+)
+_COMMENTS_SCROLL_SELECTOR = _join_selector(('shreddit-comment-tree', '#comment-tree', '[data-testid="comments-page-link"]'))
+_COMMENT_CONTAINER_SELECTOR = _join_selector(('shreddit-comment',) + _COMMENT_CLASS_SELECTORS)
+_REPLY_BUTTON_SELECTORS = (
+    'button[aria-label*="reply" i]',
+    'button[slot="reply-button"]',
+    'button:has-text("Reply")'
+)
+_REPLY_INPUT_SELECTORS = (
+    'div[contenteditable="true"]',
+    'textarea[placeholder*="comment" i]',
+    '[placeholder*="Add a comment" i]',
+    'text="Add a comment..."',
+)
+_REPLY_SUBMIT_SELECTORS = (
+    'button[slot="submit-button"]',
+    'form button[type="submit"]',
+    'button:has-text("Comment")',
+    'button:has-text("Reply")',
+)
+
+# Publish-time patterns in priority order, matched against the page text in one pass
+# (one innerText read instead of a text=/regex/ selector DOM walk per pattern)
+_PUBLISH_TIME_JS = '''
+    () => {
+        const patterns = [/\\d{4}-\\d{2}-\\d{2}/, /\\d+ months? ago/, /\\d+ days? ago/,
+                          /\\d+ hours? ago/, /today/, /yesterday/];
+        const text = document.body ? document.body.innerText : "";
+        for (const pattern of patterns) {
+            const match = text.match(pattern);
+            if (match) return match[0];
+        }
+        return null;
+    }
+'''
+# Same patterns for parsing fetched HTML in Python
+_PUBLISH_TIME_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r"\d{4}-\d{2}-\d{2}", r"\d+ months? ago", r"\d+ days? ago", r"\d+ hours? ago", r"today", r"yesterday"
+))
+
+def _append_line(path: str, line: str):
+    """Append one line to a text file (run in a worker thread)"""
+    with open(path, "a", encoding="utf-8") as output:
+        output.write(line + "\n")
+
+def _is_bot_wall(response) -> bool:
+    """True when a .json request hit a block (403, or an HTML page instead of JSON);
+    rate limits and server errors are transient and return False"""
+    if response.status == 403:
+        return True
+    return response.ok and "json" not in response.headers.get("content-type", "")
 
 class RedditPlatform(BasePlatform):
     """Self-contained Reddit platform implementation"""
@@ -20,6 +247,16 @@ class RedditPlatform(BasePlatform):
     def __init__(self, browser_context: Optional[BrowserContext] = None, main_page: Optional[Page] = None):
         super().__init__(browser_context, main_page)
         self.is_logged_in = False
+        # Cleared once a .json request hits a bot wall, so later calls skip the probe
+        self.json_comments_available = True
+        self.json_search_available = True
+        # When the logged-out state was last confirmed on the home page (time.monotonic)
+        self._login_checked_at = 0.0
+        # Browser context that already has the comment extractor init script
+        self._init_script_context = None
+        # Reddit API bearer token and when it expires (time.monotonic), see _get_api_token
+        self._api_token: Optional[str] = None
+        self._api_token_expires = 0.0
     
     def get_platform_name(self) -> str:
         return "reddit"
@@ -27,24 +264,47 @@ class RedditPlatform(BasePlatform):
     def get_base_url(self) -> str:
         return "https://www.reddit.com"
     
+    @service_mcp.on_browser_loop
     async def ensure_browser(self) -> bool:
         """Ensure browser is initialized using shared utility"""
         result = await service_mcp.ensure_browser()
         # Update our references to shared browser context and page
         self.browser_context = service_mcp.browser_context
         self.main_page = service_mcp.main_page
-        # Check login status
-        if not self.is_logged_in:
-            if self.main_page:
+        if self.browser_context is not None and self._init_script_context is not self.browser_context:
+            try:
+                await self.browser_context.add_init_script(script=_EXTRACT_COMMENTS_INIT_SCRIPT)
+                self._init_script_context = self.browser_context
+            except Exception as e:
+                logger.debug("Could not register comment extractor init script: %s", e)
+        # Check login status. A confirmed login is kept; a logged-out result is reused
+        # for LOGIN_RECHECK_SECONDS so concurrent or back-to-back calls do not each
+        # reload the home page
+        if not self.is_logged_in and self.main_page:
+            now = time.monotonic()
+            if now - self._login_checked_at >= LOGIN_RECHECK_SECONDS:
+                self._login_checked_at = now
                 try:
-                    await self.main_page.goto("https://www.reddit.com", timeout=60000)
-                    await asyncio.sleep(3)
+                    await self._open_home_page()
                     login_elements = await self.main_page.query_selector_all('text="Log In"')
                     self.is_logged_in = not bool(login_elements)
                 except:
-                    pass
+                    self._login_checked_at = 0.0  # Check again on the next call
         return result
     
+    async def _open_home_page(self):
+        """Open the Reddit home page and give the header time to show the "Log In" button
+        
+        Uses DOMContentLoaded rather than the full load event; the wait ends as soon as
+        the button appears and otherwise after 3s (logged-in pages never show it).
+        """
+        await self.main_page.goto("https://www.reddit.com", timeout=60000, wait_until="domcontentloaded")
+        try:
+            await self.main_page.wait_for_selector('text="Log In"', timeout=3000)
+        except:
+            pass
+    
+    @service_mcp.on_browser_loop
     async def login(self) -> str:
         """Login to Reddit account"""
         await self.ensure_browser()
@@ -57,8 +317,7 @@ class RedditPlatform(BasePlatform):
         
         try:
             # Visit Reddit login page
-            await self.main_page.goto("https://www.reddit.com", timeout=60000)
-            await asyncio.sleep(3)
+            await self._open_home_page()
             
             # Find and click login button
             login_elements = await self.main_page.query_selector_all('text="Log In"')
@@ -68,24 +327,21 @@ class RedditPlatform(BasePlatform):
                 # Prompt user to manually login
                 message = "Please complete the login in the opened browser window. The system will continue automatically after successful login."
                 
-                # Wait for user to login successfully
+                # Wait for user to login successfully (the "Log In" button goes away)
                 max_wait_time = 180  # Wait 3 minutes
-                wait_interval = 5
-                waited_time = 0
-                
-                while waited_time < max_wait_time:
-                    # Check if login was successful
-                    still_login = await self.main_page.query_selector_all('text="Log In"')
-                    if not still_login:
-                        self.is_logged_in = True
-                        await asyncio.sleep(2)  # Wait for page to load
-                        return "Login successful!"
-                    
-                    # Continue waiting
-                    await asyncio.sleep(wait_interval)
-                    waited_time += wait_interval
+                try:
+                    await self.main_page.wait_for_selector('text="Log In"', state="detached", timeout=max_wait_time * 1000)
+                except Exception:
+                    return "Login wait timeout. Please retry or login manually before using other features."
                 
-                return "Login wait timeout. Please retry or login manually before using other features."
+                self.is_logged_in = True
+                try:
+                    await self.main_page.wait_for_load_state("domcontentloaded")  # Wait for page to load
+                except Exception:
+                    pass
+                # Persist session cookies so the next start is already logged in
+                await service_mcp.save_browser_state()
+                return "Login successful!"
             else:
                 self.is_logged_in = True
                 return "Already logged in to Reddit account"
@@ -134,770 +390,756 @@ Be strict - only say YES if it's clearly related to our product and not a compet
             print(f"[WARNING] LLM relevance check failed for post '{post_title}': {e}. Including post by default.")
             return True  # On error, include the post to avoid false negatives
     
-    async def search_posts(self, keywords: str, limit: int = 100, product_description: Optional[str] = None) -> str:
+    @service_mcp.on_browser_loop
+    async def search_posts(self, keywords: str, limit: int = 100, product_description: Optional[str] = None,
+                           structured: bool = False) -> Union[str, List[Dict[str, str]]]:
         """Search for Reddit posts
         
         Args:
             keywords: Search keywords
             limit: Maximum number of results
             product_description: Optional product description for relevance filtering
+            structured: Return the {"title", "href"} records instead of formatted text
+                (an empty list when nothing was found or the search failed)
         """
+        cache_key = f"{keywords}\x00{limit}\x00{product_description or ''}"
+        cached = service_mcp.search_cache.get(cache_key, service_mcp.SEARCH_CACHE_TTL)
+        if isinstance(cached, list):
+            return cached if structured else self._format_search_results(cached)
+        
         login_status = await self.ensure_browser()
         if not login_status:
-            return "Please login to Reddit account first"
+            return [] if structured else "Please login to Reddit account first"
         
         if not self.main_page:
-            return "Browser page not initialized, please retry"
+            return [] if structured else "Browser page not initialized, please retry"
         
         try:
-            search_start = time.time()
-            print(f"[TIMING] Starting search stage - Searching for: {keywords}")
-            
+            posts = [post async for post in self._search_posts_stream(keywords, limit, product_description)]
+        except Exception as e:
+            if structured:
+                logger.warning("Error searching posts: %s", e)
+                return []
+            return f"Error searching posts: {str(e)}"
+        
+        if posts:
+            service_mcp.search_cache.set(cache_key, posts)
+        return posts if structured else self._format_search_results(posts)
+    
+    def _format_search_results(self, posts: List[Dict[str, str]]) -> str:
+        """Format search records for display (built as a list and joined once)"""
+        if not posts:
+            return "No posts found matching the search keywords"
+        parts = ["Search results:\n\n"]
+        for count, post in enumerate(posts, 1):
+            parts.append(f"{count}. {post['title']}\n Link: {post['href']}\n\n")
+        return "".join(parts)
+    
+    async def search_posts_stream(self, keywords: str, limit: int = 100,
+                                  product_description: Optional[str] = None) -> AsyncIterator[Dict[str, str]]:
+        """Search for Reddit posts, yielding each {"title", "href"} record as soon as it is ready
+        
+        Records are also appended to data/search_<timestamp>_<id>.ndjson as they are
+        yielded (written off the event loop).
+        Iterate it on the browser loop (see service_mcp.run_on_browser_loop); from any
+        other loop use search_posts.
+        
+        Args:
+            keywords: Search keywords
+            limit: Maximum number of results
+            product_description: Optional product description for relevance filtering
+        """
+        login_status = await self.ensure_browser()
+        if not login_status:
+            raise RuntimeError("Please login to Reddit account first")
+        
+        if not self.main_page:
+            raise RuntimeError("Browser page not initialized, please retry")
+        
+        output_path = os.path.join(
+            service_mcp.DATA_DIR, f"search_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.ndjson"
+        )
+        async for post in self._search_posts_stream(keywords, limit, product_description):
+            await asyncio.to_thread(_append_line, output_path, json.dumps(post, ensure_ascii=False))
+            yield post
+    
+    async def _search_posts_stream(self, keywords: str, limit: int,
+                                   product_description: Optional[str]) -> AsyncIterator[Dict[str, str]]:
+        """Search post records in result order (browser must be ready)"""
+        search_start = time.time()
+        logger.debug("[TIMING] Starting search stage - Searching for: %s", keywords)
+        
+        # Fast path: the search JSON listing, fetched without rendering the page
+        query_start = time.time()
+        extract_start = query_start
+        raw_posts = await self._search_posts_json(keywords, limit) if self.json_search_available else None
+        
+        if raw_posts is None:
             # Stage 1: Navigate to search page
             nav_start = time.time()
             search_url = f"https://www.reddit.com/search/?q={keywords}"
             await self.main_page.goto(search_url, timeout=60000, wait_until="domcontentloaded")
             nav_time = time.time() - nav_start
-            print(f"[TIMING] Navigation to search page took: {nav_time:.2f}s")
+            logger.debug("[TIMING] Navigation to search page took: %.2fs", nav_time)
             
             # Stage 2: Wait for search results to load
             wait_start = time.time()
             try:
                 # Wait for post elements to appear
-                await self.main_page.wait_for_selector('a[href*="/r/"][href*="/comments/"], a[data-testid="post-title"]', timeout=5000)
+                await self.main_page.wait_for_selector(_POST_LINK_SELECTOR, timeout=5000)
                 wait_time = time.time() - wait_start
-                print(f"[TIMING] Waiting for search results took: {wait_time:.2f}s")
+                logger.debug("[TIMING] Waiting for search results took: %.2fs", wait_time)
             except:
-                await asyncio.sleep(2)  # Fallback wait
+                # No results rendered within the wait; extraction below returns whatever is there
                 wait_time = time.time() - wait_start
-                print(f"[TIMING] Waiting for search results (fallback) took: {wait_time:.2f}s")
+                logger.debug("[TIMING] Waiting for search results timed out after: %.2fs", wait_time)
             
-            # Stage 3: Query post elements using multiple methods in parallel
+            # Stage 3: Query post links and extract href/title in a single round-trip
             query_start = time.time()
-            
-            # Method 1: Try title links with /r/ and /comments/ pattern
-            method1_start = time.time()
-            method1_elements = []
-            try:
-                method1_elements = await self.main_page.query_selector_all('a[href*="/r/"][href*="/comments/"]')
-                method1_time = time.time() - method1_start
-                print(f"[TIMING] Method 1 (title links) query took: {method1_time:.2f}s, found {len(method1_elements)} elements")
-            except Exception as e:
-                method1_time = time.time() - method1_start
-                print(f"[TIMING] Method 1 failed after {method1_time:.2f}s: {e}")
-            
-            # Method 2: Try data-testid="post-title" (new Reddit)
-            method2_start = time.time()
-            method2_elements = []
-            try:
-                method2_elements = await self.main_page.query_selector_all('a[data-testid="post-title"]')
-                method2_time = time.time() - method2_start
-                print(f"[TIMING] Method 2 (data-testid) query took: {method2_time:.2f}s, found {len(method2_elements)} elements")
-            except Exception as e:
-                method2_time = time.time() - method2_start
-                print(f"[TIMING] Method 2 failed after {method2_time:.2f}s: {e}")
-            
-            # Method 3: Pattern matching on all links
-            method3_start = time.time()
-            method3_elements = []
-            try:
-                all_links = await self.main_page.query_selector_all('a[href*="/r/"]')
-                print(f"Found {len(all_links)} links with /r/ pattern")
-                
-                # Filter for post links (contain /comments/)
-                for link in all_links:
+            extract_start = query_start
+            raw_posts = await self.main_page.evaluate(
+                "(selector) => Array.from(document.querySelectorAll(selector)).map(a => [a.getAttribute('href'), a.textContent])",
+                _POST_LINK_SELECTOR
+            )
+        
+        # Stage 4: Normalize and deduplicate post URLs (O(1) set lookups), keeping document order
+        candidate_posts = []
+        seen_urls = set()
+        for href, title in raw_posts:
+            if not href or not title:
+                continue
+            if not href.startswith('http'):
+                href = f"https://www.reddit.com{href}"
+            full_url = service_mcp.canonicalize_url(href)
+            if full_url in seen_urls:
+                continue
+            seen_urls.add(full_url)
+            candidate_posts.append({"href": full_url, "title": title.strip()})
+            if len(candidate_posts) >= limit:
+                break
+        
+        query_time = time.time() - query_start
+        logger.debug("[TIMING] Querying and extracting post links took: %.2fs, found %s unique posts", query_time, len(candidate_posts))
+        
+        # Stage 5: Filter posts by relevance using LLM (if product_description provided)
+        filter_start = time.time()
+        filtered_count = 0
+        
+        # Stream posts in result order; with a product description, relevance checks
+        # run concurrently and each post is yielded once its own check finishes
+        if product_description and candidate_posts:
+            relevance_tasks = [
+                asyncio.ensure_future(self._is_post_relevant(post['title'], product_description))
+                for post in candidate_posts
+            ]
+        else:
+            relevance_tasks = None
+        
+        found = 0
+        try:
+            for i, post in enumerate(candidate_posts[:limit]):
+                if relevance_tasks is not None:
                     try:
-                        href = await link.get_attribute('href')
-                        if href and '/comments/' in href and '/r/' in href:
-                            method3_elements.append(link)
-                    except:
-                        continue
-                method3_time = time.time() - method3_start
-                print(f"[TIMING] Method 3 (pattern matching) query took: {method3_time:.2f}s, found {len(method3_elements)} elements")
-            except Exception as e:
-                method3_time = time.time() - method3_start
-                print(f"[TIMING] Method 3 failed after {method3_time:.2f}s: {e}")
-            
-            # Combine results from all methods, prioritizing Method 1 and 2
-            post_elements = []
-            seen_hrefs = set()
-            
-            for element in method1_elements + method2_elements:
-                try:
-                    href = await element.get_attribute('href')
-                    if href and href not in seen_hrefs:
-                        post_elements.append(element)
-                        seen_hrefs.add(href)
-                except:
-                    continue
-            
-            # Add Method 3 results if needed
-            for element in method3_elements:
-                try:
-                    href = await element.get_attribute('href')
-                    if href and href not in seen_hrefs:
-                        post_elements.append(element)
-                        seen_hrefs.add(href)
-                except:
-                    continue
-            
-            query_time = time.time() - query_start
-            print(f"[TIMING] Total query time (all methods) took: {query_time:.2f}s, found {len(post_elements)} unique posts")
-            
-            # Stage 4: Extract href and title from post elements in parallel
-            extract_start = time.time()
-            
-            async def extract_post_info(element):
-                """Extract href and title from a post element"""
-                try:
-                    href = await element.get_attribute('href')
-                    title = await element.text_content()
-                    return href, title
-                except:
-                    return None, None
-            
-            # Extract in parallel
-            extract_tasks = [extract_post_info(element) for element in post_elements[:limit]]
-            extract_results = await asyncio.gather(*extract_tasks, return_exceptions=True)
-            
-            # Stage 5: Filter posts by relevance using LLM (if product_description provided)
-            filter_start = time.time()
-            filtered_count = 0
-            
-            # First, collect all valid posts with normalized URLs
-            candidate_posts = []
-            for result in extract_results:
-                if isinstance(result, Exception):
-                    continue
-                href, title = result
-                if href and title:
-                    # Normalize URL
-                    if href and '/r/' in href and '/comments/' in href:
-                        if not href.startswith('http'):
-                            full_url = f"https://www.reddit.com{href}"
-                        else:
-                            full_url = href
-                        candidate_posts.append({"href": full_url, "title": title.strip()})
-            
-            # If product_description is provided, filter posts in parallel using LLM
-            if product_description and candidate_posts:
-                async def check_relevance(post):
-                    """Check if a post is relevant"""
-                    is_relevant = await self._is_post_relevant(post['title'], product_description)
-                    return post if is_relevant else None
-                
-                # Check relevance in parallel
-                relevance_tasks = [check_relevance(post) for post in candidate_posts]
-                relevance_results = await asyncio.gather(*relevance_tasks, return_exceptions=True)
-                
-                # Collect only relevant posts
-                posts = []
-                for result in relevance_results:
-                    if isinstance(result, Exception):
+                        if not await relevance_tasks[i]:
+                            filtered_count += 1
+                            continue
+                    except Exception:
                         continue
-                    if result is not None:  # Post is relevant
-                        posts.append(result)
-                    else:  # Post was filtered out
-                        filtered_count += 1
-            else:
-                # No filtering, include all candidate posts
-                posts = candidate_posts
-            
-            filter_time = time.time() - filter_start
-            if product_description and filtered_count > 0:
-                print(f"[TIMING] LLM filtering took: {filter_time:.2f}s, filtered {filtered_count} posts, kept {len(posts)} posts")
-            
-            extract_time = time.time() - extract_start
-            print(f"[TIMING] Extracting {len(post_elements[:limit])} post info in parallel took: {extract_time:.2f}s")
-            
-            # Limit results
-            posts = posts[:limit]
-            
-            total_time = time.time() - search_start
-            print(f"[TIMING] Total search stage took: {total_time:.2f}s, found {len(posts)} posts")
-            
-            # Format results
-            if not posts:
-                return "No posts found matching the search keywords"
-            
-            result = "Search results:\n\n"
-            for i, post in enumerate(posts, 1):
-                result += f"{i}. {post['title']}\n"
-                result += f" Link: {post['href']}\n\n"
-            
-            return result
+                found += 1
+                yield post
+        finally:
+            if relevance_tasks is not None:
+                for task in relevance_tasks:
+                    task.cancel()
         
+        filter_time = time.time() - filter_start
+        if product_description and filtered_count > 0:
+            logger.debug("[TIMING] LLM filtering took: %.2fs, filtered %s posts, kept %s posts", filter_time, filtered_count, found)
+        
+        extract_time = time.time() - extract_start
+        logger.debug("[TIMING] Extracting and filtering %s posts took: %.2fs", len(candidate_posts), extract_time)
+        
+        total_time = time.time() - search_start
+        logger.debug("[TIMING] Total search stage took: %.2fs, found %s posts", total_time, found)
+    
+    async def _search_posts_json(self, keywords: str, limit: int) -> Optional[List[List[str]]]:
+        """Get [permalink, title] pairs from the search .json listing (None if unavailable)
+        
+        Uses the browser context's request API like _fetch_comments_json.
+        """
+        if self.browser_context is None:
+            return None
+        
+        try:
+            response = await self.browser_context.request.get(
+                "https://www.reddit.com/search.json",
+                params={"q": keywords, "limit": str(min(max(limit, 1), 100)), "type": "link", "raw_json": "1"},
+                timeout=15000
+            )
+            if _is_bot_wall(response):
+                # Blocked or redirected to a bot wall; stop probing and use the browser
+                logger.debug("JSON search blocked (HTTP %s) for %s", response.status, keywords)
+                self.json_search_available = False
+                return None
+            if not response.ok:
+                # Rate limited or a server error; use the browser for this call only
+                logger.debug("JSON search unavailable (HTTP %s) for %s", response.status, keywords)
+                return None
+            listing = await response.json()
+            children = listing["data"]["children"]
         except Exception as e:
-            return f"Error searching posts: {str(e)}"
+            logger.debug("JSON search request failed for %s: %s", keywords, e)
+            return None
+        
+        return [
+            [child["data"].get("permalink"), child["data"].get("title")]
+            for child in children
+            if child.get("kind") == "t3" and isinstance(child.get("data"), dict)
+        ]
     
+    @service_mcp.on_browser_loop
     async def get_post_content(self, url: str) -> str:
         """Get Reddit post content"""
+        cached = service_mcp.post_cache.get(service_mcp.canonicalize_url(url), service_mcp.POST_CACHE_TTL)
+        if cached is not None:
+            return self._format_post(url, cached)
+        
         login_status = await self.ensure_browser()
         if not login_status:
             return "Please login to Reddit account first"
         
-        if not self.main_page:
-            return "Browser page not initialized, please retry"
+        try:
+            pool = await service_mcp.get_page_pool()
+            async with pool.page() as page:
+                post_content = await self._fetch_post(page, url)
+            self._cache_post(url, post_content)
+            return self._format_post(url, post_content)
         
+        except Exception as e:
+            return f"Error getting post content: {str(e)}"
+    
+    async def _wait_for_post(self, page: Page):
+        """Wait up to 3s for the post to render (see _POST_READY_JS)"""
         try:
-            # Visit post link
-            await self.main_page.goto(url, timeout=60000, wait_until="domcontentloaded")
-            # Wait for post content to appear instead of fixed sleep
-            try:
-                await self.main_page.wait_for_selector('h1[data-testid="post-title"], h1, [data-testid="post-title"]', timeout=3000)
-            except:
-                await asyncio.sleep(1)  # Minimal fallback
-            
-            # Get post content
-            post_content = {}
-            
-            # Get post title
-            try:
-                title_element = await self.main_page.query_selector('text="edited"')
-                if title_element:
-                    title = await title_element.evaluate('(el) => el.previousElementSibling ? el.previousElementSibling.textContent : ""')
-                    post_content["Title"] = title.strip() if title else "Unknown title"
-                else:
-                    post_content["Title"] = "Unknown title"
-            except Exception as e:
-                post_content["Title"] = "Unknown title"
-            
-            # Get author
-            try:
-                author_element = await self.main_page.query_selector('a[href*="/user/profile/"]')
-                if author_element:
-                    author = await author_element.text_content()
-                    post_content["Author"] = author.strip() if author else "Unknown author"
-                else:
-                    post_content["Author"] = "Unknown author"
-            except Exception as e:
-                post_content["Author"] = "Unknown author"
-            
-            # Get publish time
+            await page.wait_for_function(_POST_READY_JS, arg=_POST_READY_SELECTOR, timeout=3000)
+        except Exception:
+            pass  # Extraction copes with a partially rendered page
+    
+    async def _fetch_post(self, page: Page, url: str) -> Dict[str, str]:
+        """Load a post on the given page and extract Title/Author/PublishTime/Content"""
+        # Visit post link
+        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        await self._wait_for_post(page)
+        
+        # Parse one HTML snapshot in-process instead of querying field by field
+        if HTMLParser is not None:
             try:
-                time_selectors = [
-                    'text=/\\d{4}-\\d{2}-\\d{2}/',
-                    'text=/\\d+ months? ago/',
-                    'text=/\\d+ days? ago/',
-                    'text=/\\d+ hours? ago/',
-                    'text=/today/',
-                    'text=/yesterday/'
-                ]
-                
-                post_content["PublishTime"] = "Unknown"
-                for selector in time_selectors:
-                    time_element = await self.main_page.query_selector(selector)
-                    if time_element:
-                        post_content["PublishTime"] = await time_element.text_content()
-                        break
+                post_content = self._parse_post_html(await page.content())
+                if post_content["Content"] != "Failed to get content":
+                    return post_content
             except Exception as e:
-                post_content["PublishTime"] = "Unknown"
+                logger.debug("HTML parsing failed for %s, using page queries: %s", url, e)
+        
+        # Get post content
+        post_content = {}
+        
+        # Get post title (same selector priority as _parse_post_html)
+        title = await service_mcp.get_text_by_selectors(page, _POST_TITLE_SELECTORS)
+        post_content["Title"] = title or "Unknown title"
+        
+        # Get author
+        author = await service_mcp.get_text_by_selectors(page, ['a[href*="/user/profile/"]'])
+        post_content["Author"] = author or "Unknown author"
+        
+        # Get publish time (first matching pattern, checked in order in one page round-trip)
+        try:
+            publish_time = await page.evaluate(_PUBLISH_TIME_JS)
+            post_content["PublishTime"] = publish_time or "Unknown"
+        except Exception as e:
+            post_content["PublishTime"] = "Unknown"
+        
+        # Get post body content
+        try:
+            # First content selector with substantial text, checked in one round-trip
+            content_text = await service_mcp.get_text_by_selectors(page, _CONTENT_SELECTORS, 10)
+            post_content["Content"] = content_text or "Failed to get content"
             
-            # Get post body content
-            try:
-                content_selectors = [
-                    'div.content', 
-                    'div.note-content',
-                    'article',
-                    'div.desc'
-                ]
-                
-                post_content["Content"] = "Failed to get content"
-                for selector in content_selectors:
-                    content_element = await self.main_page.query_selector(selector)
-                    if content_element:
-                        content_text = await content_element.text_content()
-                        if content_text and len(content_text.strip()) > 10:
-                            post_content["Content"] = content_text.strip()
-                            break
+            # Use JavaScript to extract main text content
+            if post_content["Content"] == "Failed to get content":
+                content_text = await page.evaluate(_LARGEST_TEXT_BLOCK_JS)
                 
-                # Use JavaScript to extract main text content
-                if post_content["Content"] == "Failed to get content":
-                    content_text = await self.main_page.evaluate('''
-                        () => {
-                            const contentElements = Array.from(document.querySelectorAll('div, p, article'))
-                                .filter(el => {
-                                    const text = el.textContent.trim();
-                                    return text.length > 50 && text.length < 5000 &&
-                                        el.querySelectorAll('a, button').length < 5 &&
-                                        el.children.length < 10;
-                                })
-                                .sort((a, b) => b.textContent.length - a.textContent.length);
-                            
-                            if (contentElements.length > 0) {
-                                return contentElements[0].textContent.trim();
-                            }
-                            
-                            return null;
-                        }
-                    ''')
-                    
-                    if content_text:
-                        post_content["Content"] = content_text
-            except Exception as e:
-                post_content["Content"] = f"Error getting content: {str(e)}"
-            
-            # Format return results
-            result = f"Title: {post_content['Title']}\n"
-            result += f"Author: {post_content['Author']}\n"
-            result += f"Publish Time: {post_content['PublishTime']}\n"
-            result += f"Link: {url}\n\n"
-            result += f"Content:\n{post_content['Content']}"
-            
-            return result
-        
+                if content_text:
+                    post_content["Content"] = content_text
         except Exception as e:
-            return f"Error getting post content: {str(e)}"
+            post_content["Content"] = f"Error getting content: {str(e)}"
+        
+        return post_content
+    
+    def _parse_post_html(self, html: str) -> Dict[str, str]:
+        """Extract Title/Author/PublishTime/Content from post page HTML (requires selectolax)"""
+        tree = HTMLParser(html)
+        # Drop non-rendered text (hydration JSON, CSS) so it matches what the page shows
+        tree.strip_tags(["script", "style", "noscript", "template"])
+        post_content = {}
+        
+        # First title selector that matches, in priority order (as _fetch_post's page queries)
+        post_content["Title"] = "Unknown title"
+        for selector in _POST_TITLE_SELECTORS:
+            node = tree.css_first(selector)
+            title = node.text().strip() if node else ""
+            if title:
+                post_content["Title"] = title
+                break
+        
+        author_node = tree.css_first('a[href*="/user/profile/"]')
+        author = author_node.text().strip() if author_node else ""
+        post_content["Author"] = author or "Unknown author"
+        
+        post_content["PublishTime"] = "Unknown"
+        page_text = tree.body.text(separator=" ") if tree.body else ""
+        for pattern in _PUBLISH_TIME_PATTERNS:
+            match = pattern.search(page_text)
+            if match:
+                post_content["PublishTime"] = match.group(0)
+                break
+        
+        post_content["Content"] = "Failed to get content"
+        for selector in _CONTENT_SELECTORS:
+            node = tree.css_first(selector)
+            text = node.text().strip() if node else ""
+            if len(text) > 10:
+                post_content["Content"] = text
+                break
+        else:
+            # Largest text block that does not look like navigation or a listing
+            best = ""
+            for node in tree.css('div, p, article'):
+                text = node.text().strip()
+                if (50 < len(text) < 5000 and len(text) > len(best)
+                        and len(node.css('a, button')) < 5
+                        and sum(1 for _ in node.iter()) < 10):
+                    best = text
+            if best:
+                post_content["Content"] = best
+        
+        return post_content
     
+    def _cache_post(self, url: str, post_content: Dict[str, str]):
+        """Cache extracted post fields unless the body could not be read"""
+        content = post_content.get("Content", "")
+        if content != "Failed to get content" and not content.startswith("Error getting content"):
+            service_mcp.post_cache.set(service_mcp.canonicalize_url(url), post_content)
+    
+    def _format_post(self, url: str, post_content: Dict[str, str]) -> str:
+        """Format extracted post fields for display"""
+        return (
+            f"Title: {post_content['Title']}\n"
+            f"Author: {post_content['Author']}\n"
+            f"Publish Time: {post_content['PublishTime']}\n"
+            f"Link: {url}\n\n"
+            f"Content:\n{post_content['Content']}"
+        )
+    
+    @service_mcp.on_browser_loop
     async def get_post_comments(self, url: str) -> List[Dict[str, Any]]:
-        """Get Reddit post comments (returns structured data)"""
+        """Get Reddit post comments (returns structured data)
+        
+        Runs on a page from the shared page pool, so calls for different posts
+        can be gathered concurrently.
+        """
         login_status = await self.ensure_browser()
         if not login_status:
             return []
         
-        if not self.main_page:
+        try:
+            # Fast path: the post's JSON listing, fetched without rendering the page
+            if self.json_comments_available:
+                comments = await self._fetch_comments_json(url)
+                if comments is not None:
+                    return comments
+            
+            pool = await service_mcp.get_page_pool()
+            async with pool.page() as page:
+                return await self._fetch_comments(page, url)
+        
+        except Exception as e:
+            logger.warning("Error getting post comments: %s", e)
             return []
+    
+    async def _get_comment_listing(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """Get the post's comment data dicts in thread order from its .json listing
+        (None if unavailable)
         
+        Uses the browser context's request API, so the session cookies are sent
+        without loading or rendering the page.
+        """
+        if self.browser_context is None:
+            return None
+        
+        json_url = service_mcp.canonicalize_url(url).rstrip("/") + ".json"
         try:
-            comment_start_time = time.time()
-            print(f"[TIMING] Starting comment extraction stage - Getting comments from URL: {url}")
-            
-            # Stage 1: Navigate to post page
-            nav_start = time.time()
-            await self.main_page.goto(url, timeout=60000, wait_until="domcontentloaded")
-            nav_time = time.time() - nav_start
-            print(f"[TIMING] Navigation to post page took: {nav_time:.2f}s")
-            
-            # Wait for page content to load - use wait_for_selector instead of fixed sleep
-            wait_start = time.time()
-            try:
-                # Wait for post title or content to appear (max 3 seconds)
-                await self.main_page.wait_for_selector('h1[data-testid="post-title"], h1, [data-testid="post-title"]', timeout=3000)
-                wait_time = time.time() - wait_start
-                print(f"[TIMING] Waiting for post content took: {wait_time:.2f}s")
-            except:
-                # Fallback: minimal wait
-                await asyncio.sleep(0.5)
-                wait_time = time.time() - wait_start
-                print(f"[TIMING] Waiting for post content (fallback) took: {wait_time:.2f}s")
-            
-            comments = []
-            
-            # Method 1: Try modern Reddit selectors (shreddit-comment elements)
-            method1_start = time.time()
+            response = await self.browser_context.request.get(
+                json_url, params={"raw_json": "1"}, timeout=15000
+            )
+            if _is_bot_wall(response):
+                # Blocked or redirected to a bot wall; stop probing and use the browser
+                logger.debug("JSON comments blocked (HTTP %s) for %s", response.status, url)
+                self.json_comments_available = False
+                return None
+            if not response.ok:
+                # Rate limited or a server error; use the browser for this call only
+                logger.debug("JSON comments unavailable (HTTP %s) for %s", response.status, url)
+                return None
+            listing = await response.json()
+        except Exception as e:
+            logger.debug("JSON comments request failed for %s: %s", url, e)
+            return None
+        
+        comments = []
+        try:
+            # [post listing, comment listing]; replies nest under each comment
+            pending = list(reversed(listing[1]["data"]["children"]))
+        except (IndexError, KeyError, TypeError):
+            return None
+        while pending:
+            child = pending.pop()
+            if child.get("kind") != "t1":
+                continue  # "more" stubs need another request; skip them
+            data = child.get("data", {})
+            comments.append(data)
+            replies = data.get("replies")
+            if isinstance(replies, dict):
+                pending.extend(reversed(replies.get("data", {}).get("children", [])))
+        return comments
+    
+    async def _fetch_comments_json(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """Get comments from the post's .json listing (None if unavailable)"""
+        listing = await self._get_comment_listing(url)
+        if listing is None:
+            return None
+        
+        comments = []
+        for data in listing:
+            content = (data.get("body") or "").strip()
+            if len(content) > 10:
+                created = data.get("created_utc")
+                comments.append({
+                    "Username": data.get("author") or "[deleted]",
+                    "Content": content,
+                    "Time": time.strftime("%Y-%m-%d %H:%M", time.gmtime(created)) if created else "Unknown time"
+                })
+        
+        logger.debug("[TIMING] Got %s comments from JSON listing for %s", len(comments), url)
+        return comments
+    
+    async def _fetch_comments(self, page: Page, url: str) -> List[Dict[str, Any]]:
+        """Load a post on the given page and extract its comments"""
+        comment_start_time = time.time()
+        logger.debug("[TIMING] Starting comment extraction stage - Getting comments from URL: %s", url)
+        
+        # Stage 1: Navigate to post page
+        nav_start = time.time()
+        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        nav_time = time.time() - nav_start
+        logger.debug("[TIMING] Navigation to post page took: %.2fs", nav_time)
+        
+        # Wait for page content to load
+        wait_start = time.time()
+        await self._wait_for_post(page)
+        wait_time = time.time() - wait_start
+        logger.debug("[TIMING] Waiting for post content took: %.2fs", wait_time)
+        
+        comments = []
+        
+        comments_start = time.time()
+        try:
+            # Wait for comments to load
+            comment_wait_start = time.time()
             try:
-                # Wait for comments to load
-                comment_wait_start = time.time()
-                try:
-                    await self.main_page.wait_for_selector('shreddit-comment, .Comment, [class*="Comment"]', timeout=5000)
-                    comment_wait_time = time.time() - comment_wait_start
-                    print(f"[TIMING] Waiting for comments to load took: {comment_wait_time:.2f}s")
-                except:
-                    await asyncio.sleep(2)  # Fallback wait
-                    comment_wait_time = time.time() - comment_wait_start
-                    print(f"[TIMING] Waiting for comments (fallback) took: {comment_wait_time:.2f}s")
-                
-                # Query comment elements
-                query_start = time.time()
-                comment_elements = await self.main_page.query_selector_all('shreddit-comment')
-                query_time = time.time() - query_start
-                print(f"[TIMING] Querying shreddit-comment elements took: {query_time:.2f}s, found {len(comment_elements)} elements")
-                
-                if len(comment_elements) == 0:
-                    # Try alternative selectors
-                    comment_elements = await self.main_page.query_selector_all('.Comment, [class*="Comment"], [data-testid="comment"]')
-                    print(f"[TIMING] Querying alternative comment selectors found {len(comment_elements)} elements")
-                
-                # Process each comment element in parallel
-                process_start = time.time()
-                
-                async def process_comment_element(element):
-                    """Process a single comment element"""
-                    try:
-                        username = "[deleted]"
-                        try:
-                            # Try to get username from shadow DOM or regular DOM
-                            username_el = await element.query_selector('a[href*="/user/"], a[href*="/u/"], [data-testid="comment_author_link"]')
-                            if username_el:
-                                username_text = await username_el.text_content()
-                                if username_text:
-                                    username = username_text.strip()
-                            else:
-                                # Try JavaScript evaluation for shadow DOM
-                                username_text = await element.evaluate('''
-                                    (el) => {
-                                        if (el.shadowRoot) {
-                                            const authorLink = el.shadowRoot.querySelector('a[href*="/user/"], a[href*="/u/"]');
-                                            if (authorLink) return authorLink.textContent.trim();
-                                        }
-                                        const authorLink = el.querySelector('a[href*="/user/"], a[href*="/u/"]');
-                                        if (authorLink) return authorLink.textContent.trim();
-                                        return null;
-                                    }
-                                ''')
-                                if username_text:
-                                    username = username_text
-                        except:
-                            pass
-                        
-                        content = ""
-                        try:
-                            # Try to get content from shadow DOM
-                            content_text = await element.evaluate('''
-                                (el) => {
-                                    if (el.shadowRoot) {
-                                        const contentEl = el.shadowRoot.querySelector('[data-testid="comment"], .md, p, div[class*="comment"]');
-                                        if (contentEl) return contentEl.textContent.trim();
-                                    }
-                                    const contentEl = el.querySelector('[data-testid="comment"], .md, p, div[class*="comment"]');
-                                    if (contentEl) return contentEl.textContent.trim();
-                                    return el.textContent.trim();
-                                }
-                            ''')
-                            if content_text and len(content_text.strip()) > 10:
-                                content = content_text.strip()
-                        except:
-                            # Fallback to element text
-                            try:
-                                full_text = await element.text_content()
-                                if full_text and len(full_text.strip()) > 10:
-                                    content = full_text.strip()
-                            except:
-                                pass
-                        
-                        time_location = "Unknown time"
-                        try:
-                            time_el = await element.query_selector('time, [data-testid="comment_timestamp"]')
-                            if time_el:
-                                time_text = await time_el.get_attribute('title') or await time_el.get_attribute('datetime') or await time_el.text_content()
-                                if time_text:
-                                    time_location = time_text.strip()
-                            else:
-                                # Try shadow DOM
-                                time_text = await element.evaluate('''
-                                    (el) => {
-                                        if (el.shadowRoot) {
-                                            const timeEl = el.shadowRoot.querySelector('time');
-                                            if (timeEl) return timeEl.getAttribute('title') || timeEl.textContent.trim();
-                                        }
-                                        return null;
-                                    }
-                                ''')
-                                if time_text:
-                                    time_location = time_text
-                        except:
-                            pass
-                        
-                        # Return comment data if valid
-                        if content and len(content.strip()) > 10:  # Minimum content length
-                            return {
-                                "Username": username,
-                                "Content": content,
-                                "Time": time_location
-                            }
-                        return None
-                    except Exception as e:
-                        print(f"Error processing comment element: {e}")
-                        return None
-                
-                # Process all comment elements in parallel
-                comment_tasks = [process_comment_element(element) for element in comment_elements]
-                comment_results = await asyncio.gather(*comment_tasks, return_exceptions=True)
-                
-                # Collect valid comments
-                for result in comment_results:
-                    if isinstance(result, Exception):
-                        continue
-                    if result is not None:
-                        comments.append(result)
-                
-                if process_start:
-                    process_time = time.time() - process_start
-                    print(f"[TIMING] Processing {len(comment_elements)} comment elements in parallel took: {process_time:.2f}s")
-            except Exception as e:
-                method1_time = time.time() - method1_start
-                print(f"[TIMING] Method 1 failed after {method1_time:.2f}s: {e}")
+                await page.wait_for_function(_COMMENTS_READY_JS, arg=_COMMENTS_READY_SELECTOR, timeout=5000)
+            except Exception:
+                pass  # Extraction below copes with whatever has rendered
+            comment_wait_time = time.time() - comment_wait_start
+            logger.debug("[TIMING] Waiting for comments to load took: %.2fs", comment_wait_time)
             
-            # Method 2: Fallback to class-based selectors (old Reddit or alternative structure)
-            if len(comments) == 0:
-                method2_start = time.time()
-                print("Trying fallback selectors...")
-                try:
-                    # Try old Reddit selectors
-                    comment_elements = await self.main_page.query_selector_all('.comment, .Comment, [class*="comment"]')
-                    method2_query_time = time.time() - method2_start
-                    print(f"[TIMING] Querying fallback selectors took: {method2_query_time:.2f}s")
-                    print(f"Found {len(comment_elements)} comments using class-based selectors")
-                    
-                    # Process fallback comments
-                    fallback_process_start = time.time()
-                    
-                    for element in comment_elements:
-                        try:
-                            # Get username
-                            username = "[deleted]"
-                            try:
-                                username_el = await element.query_selector('a.author, a[class*="author"]')
-                                if username_el:
-                                    username_text = await username_el.text_content()
-                                    if username_text:
-                                        username = username_text.strip()
-                            except:
-                                pass
-                            
-                            # Get content
-                            content = ""
-                            try:
-                                content_el = await element.query_selector('.md, .usertext-body, p')
-                                if content_el:
-                                    content_text = await content_el.text_content()
-                                    if content_text:
-                                        content = content_text.strip()
-                            except:
-                                # Fallback to element text
-                                try:
-                                    full_text = await element.text_content()
-                                    if full_text:
-                                        content = full_text.strip()
-                                except:
-                                    pass
-                            
-                            # Get time
-                            time_location = "Unknown time"
-                            try:
-                                time_el = await element.query_selector('time, .live-timestamp')
-                                if time_el:
-                                    time_text = await time_el.get_attribute('title') or await time_el.text_content()
-                                    if time_text:
-                                        time_location = time_text.strip()
-                            except:
-                                pass
-                            
-                            if content and len(content.strip()) > 0:
-                                comments.append({
-                                    "Username": username,
-                                    "Content": content,
-                                    "Time": time_location
-                                })
-                        except Exception as e:
-                            print(f"Error processing fallback comment: {e}")
-                            continue
-                    
-                    fallback_process_time = time.time() - fallback_process_start
-                    print(f"[TIMING] Processing {len(comment_elements)} fallback comments took: {fallback_process_time:.2f}s")
-                except Exception as e:
-                    method2_time = time.time() - method2_start
-                    print(f"[TIMING] Method 2 failed after {method2_time:.2f}s: {e}")
-            
-            total_time = time.time() - comment_start_time
-            print(f"[TIMING] Total comment extraction stage took: {total_time:.2f}s, extracted {len(comments)} comments")
+            # Load lazily rendered comments
+            await self._load_more_comments(page)
             
-            return comments
-        
+            # Extract every comment in a single DOM walk (see _EXTRACT_COMMENTS_JS)
+            extract_start = time.time()
+            comments = await page.evaluate(_CALL_EXTRACT_COMMENTS_JS)
+            if comments is None:
+                # Page opened before the init script was registered
+                comments = await page.evaluate(_EXTRACT_COMMENTS_JS)
+            extract_time = time.time() - extract_start
+            logger.debug("[TIMING] Extracting comments in one DOM walk took: %.2fs, found %s comments", extract_time, len(comments))
         except Exception as e:
-            print(f"Error getting post comments: {str(e)}")
-            return []
+            comments_time = time.time() - comments_start
+            logger.debug("[TIMING] Comment extraction failed after %.2fs: %s", comments_time, e)
+        
+        total_time = time.time() - comment_start_time
+        logger.debug("[TIMING] Total comment extraction stage took: %.2fs, extracted %s comments", total_time, len(comments))
+        
+        return comments
     
+    async def _load_more_comments(self, page: Page, max_rounds: int = 15, stable_rounds: int = 1,
+                                  settle_ms: int = 1000):
+        """Scroll and expand "more comments" buttons until the comment count stops growing
+        
+        Each round is one scroll, one batched click of every visible load-more button,
+        and an in-page MutationObserver wait that returns as soon as new comments are
+        inserted (or after settle_ms without any), all in a single page round-trip.
+        A round that can neither scroll nor click anything returns immediately.
+        Stops after stable_rounds rounds without new comments or after max_rounds.
+        """
+        load_start = time.time()
+        previous = -1
+        stagnant = 0
+        for _ in range(max_rounds):
+            count = await page.evaluate('''
+                (settleMs) => new Promise((resolve) => {
+                    const count = () => document.querySelectorAll('shreddit-comment, div[id^="t1_"]').length;
+                    const before = count();
+                    const scrollY = window.scrollY;
+                    window.scrollBy(0, window.innerHeight);
+                    let clicked = 0;
+                    const labels = /^(load more comments|view more comments|more replies|\\d+ more repl(y|ies))$/i;
+                    for (const button of document.querySelectorAll('button, faceplate-partial [role="button"]')) {
+                        if (button.offsetParent !== null && labels.test((button.textContent || '').trim())) {
+                            button.click();
+                            clicked++;
+                        }
+                    }
+                    // Already at the bottom with nothing to expand: nothing will load
+                    if (clicked === 0 && window.scrollY === scrollY) return resolve(before);
+                    let timer = null;
+                    const observer = new MutationObserver(() => {
+                        const now = count();
+                        if (now > before) finish(now);
+                    });
+                    const finish = (now) => {
+                        observer.disconnect();
+                        clearTimeout(timer);
+                        resolve(now);
+                    };
+                    observer.observe(document.body, {childList: true, subtree: true});
+                    timer = setTimeout(() => finish(count()), settleMs);
+                })
+            ''', settle_ms)
+            if count <= previous:
+                stagnant += 1
+                if stagnant >= stable_rounds:
+                    break
+            else:
+                stagnant = 0
+                previous = count
+        
+        load_time = time.time() - load_start
+        logger.debug("[TIMING] Loading more comments took: %.2fs, %s comments on page", load_time, max(previous, 0))
+    
+    @service_mcp.on_browser_loop
     async def post_comment(self, url: str, comment_text: str, comment_type: str = "lead_gen") -> str:
-        """Post a comment on Reddit post"""
+        """Post a comment on Reddit post (on a pooled page, so posts can be handled concurrently)"""
         login_status = await self.ensure_browser()
         if not login_status:
             return "Please login to Reddit account first to post comments"
         
-        if not self.main_page:
-            return "Browser page not initialized, please retry"
-        
         try:
-            # Visit post link
-            await self.main_page.goto(url, timeout=60000, wait_until="domcontentloaded")
-            # Wait for post content to appear instead of fixed sleep
-            try:
-                await self.main_page.wait_for_selector('h1[data-testid="post-title"], h1, [data-testid="post-title"]', timeout=3000)
-            except:
-                await asyncio.sleep(1)  # Minimal fallback
-            
-            # If comment_text is provided, use it directly
-            if comment_text and comment_text.strip():
-                final_comment_text = comment_text.strip()
-            else:
-                # Get post content for analysis
-                post_content = {}
-                
-                # Get post title
-                try:
-                    title_selectors = [
-                        'h1[data-testid="post-title"]',
-                        'h1',
-                        '[data-testid="post-title"]',
-                        'a[data-testid="post-title"]'
-                    ]
-                    for selector in title_selectors:
-                        try:
-                            title_element = await self.main_page.query_selector(selector)
-                            if title_element:
-                                title = await title_element.text_content()
-                                if title and title.strip():
-                                    post_content["Title"] = title.strip()
-                                    break
-                        except:
-                            continue
-                    if "Title" not in post_content:
-                        post_content["Title"] = "Unknown title"
-                except Exception:
-                    post_content["Title"] = "Unknown title"
-                
-                # Get author
-                try:
-                    author_selectors = [
-                        'a[data-testid="post_author_link"]',
-                        'a[href*="/user/"]',
-                        'a[href*="/u/"]'
-                    ]
-                    for selector in author_selectors:
-                        try:
-                            author_element = await self.main_page.query_selector(selector)
-                            if author_element:
-                                author = await author_element.text_content()
-                                if author and author.strip():
-                                    post_content["Author"] = author.strip()
-                                    break
-                        except:
-                            continue
-                    if "Author" not in post_content:
-                        post_content["Author"] = "Unknown author"
-                except Exception:
-                    post_content["Author"] = "Unknown author"
-                
-                # Get post body content
-                try:
-                    content_selectors = [
-                        'div[data-testid="post-content"]',
-                        'div.md',
-                        'article',
-                        'div[data-testid="comment"]'
-                    ]
-                    
-                    post_content["Content"] = "Failed to get content"
-                    for selector in content_selectors:
-                        try:
-                            content_element = await self.main_page.query_selector(selector)
-                            if content_element:
-                                content_text = await content_element.text_content()
-                                if content_text and len(content_text.strip()) > 10:
-                                    post_content["Content"] = content_text.strip()
-                                    break
-                        except:
-                            continue
-                    
-                    # Use JavaScript to extract main text content
-                    if post_content["Content"] == "Failed to get content":
-                        content_text = await self.main_page.evaluate('''
-                            () => {
-                                const contentElements = Array.from(document.querySelectorAll('div, p, article'))
-                                    .filter(el => {
-                                        const text = el.textContent.trim();
-                                        return text.length > 50 && text.length < 5000 &&
-                                            el.querySelectorAll('a, button').length < 5 &&
-                                            el.children.length < 10;
-                                    })
-                                    .sort((a, b) => b.textContent.length - a.textContent.length);
-                                
-                                if (contentElements.length > 0) {
-                                    return contentElements[0].textContent.trim();
-                                }
-                                
-                                return null;
-                            }
-                        ''')
-                        
-                        if content_text:
-                            post_content["Content"] = content_text
-                except Exception:
-                    post_content["Content"] = "Failed to get content"
-                
-                # Generate smart comment based on post content and comment type
-                final_comment_text = await self._generate_smart_comment(post_content, comment_type)
-            
-            # Use shared utility to type and submit comment
-            input_selectors = [
-                'paragraph:has-text("Add a comment...")',
-                'text="Add a comment..."',
-                'text="What are your thoughts?"',
-                'div[contenteditable="true"]',
-                'textarea[placeholder*="comment"]'
-            ]
-            
-            submit_selectors = [
-                'button:has-text("Comment")',
-                'button:has-text("Post")',
-                'button[type="submit"]',
-                'button[data-testid="submit-button"]'
-            ]
-            
-            scroll_selector = 'text="comments"'
-            
-            success, message = await service_mcp.type_and_submit_comment(
-                page=self.main_page,
-                comment_text=final_comment_text,
-                input_selectors=input_selectors,
-                submit_selectors=submit_selectors,
-                scroll_to_selector=scroll_selector
-            )
-            
-            return message
+            pool = await service_mcp.get_page_pool()
+            async with pool.page() as page:
+                return await self._post_comment_on_page(page, url, comment_text, comment_type)
         
         except Exception as e:
             return f"Error posting comment: {str(e)}"
     
+    @service_mcp.on_browser_loop
+    async def generate_comment(self, url: str, comment_type: str = "lead_gen") -> str:
+        """Generate a smart comment for a Reddit post without posting it
+        
+        Raises:
+            RuntimeError: If not logged in and the post is not cached
+        """
+        # Reuse the post if get_post_content already extracted it
+        post_content = service_mcp.post_cache.get(service_mcp.canonicalize_url(url), service_mcp.POST_CACHE_TTL)
+        if post_content is None:
+            login_status = await self.ensure_browser()
+            if not login_status:
+                raise RuntimeError("Please login to Reddit first")
+            
+            pool = await service_mcp.get_page_pool()
+            async with pool.page() as page:
+                await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+                await self._wait_for_post(page)
+                post_content = await self._extract_post_for_comment(page)
+        
+        return await self._generate_smart_comment(post_content, comment_type)
+    
+    async def _post_comment_on_page(self, page: Page, url: str, comment_text: str, comment_type: str) -> str:
+        """Open the post on the given page, generate the comment if none was given, and submit it"""
+        # Visit post link
+        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        await self._wait_for_post(page)
+        
+        # If comment_text is provided, use it directly
+        if comment_text and comment_text.strip():
+            final_comment_text = comment_text.strip()
+        else:
+            # Reuse the post if get_post_content already extracted it
+            post_content = service_mcp.post_cache.get(service_mcp.canonicalize_url(url), service_mcp.POST_CACHE_TTL)
+            if post_content is None:
+                post_content = await self._extract_post_for_comment(page)
+            
+            # Generate smart comment based on post content and comment type
+            final_comment_text = await self._generate_smart_comment(post_content, comment_type)
+        
+        # Use shared utility to type and submit comment
+        success, message = await service_mcp.type_and_submit_comment(
+            page=page,
+            comment_text=final_comment_text,
+            input_selectors=_COMMENT_INPUT_SELECTORS,
+            submit_selectors=_COMMENT_SUBMIT_SELECTORS,
+            scroll_to_selector=_COMMENTS_SCROLL_SELECTOR
+        )
+        
+        return message
+    
+    async def _extract_post_for_comment(self, page: Page) -> Dict[str, str]:
+        """Extract Title/Author/Content from the open post page for comment generation"""
+        post_content = {}
+        
+        # Get title, author and body text, each from its first matching selector
+        title, author, content = await service_mcp.get_texts_by_selectors(page, [
+            (_POST_TITLE_SELECTORS, 0),
+            (_POST_AUTHOR_SELECTORS, 0),
+            (_POST_BODY_SELECTORS, 10),
+        ])
+        post_content["Title"] = title or "Unknown title"
+        post_content["Author"] = author or "Unknown author"
+        post_content["Content"] = content or "Failed to get content"
+        
+        # Use JavaScript to extract main text content
+        if post_content["Content"] == "Failed to get content":
+            try:
+                content_text = await page.evaluate(_LARGEST_TEXT_BLOCK_JS)
+                if content_text:
+                    post_content["Content"] = content_text
+            except Exception:
+                pass
+        
+        return post_content
+    
+    @service_mcp.on_browser_loop
     async def reply_to_comment(self, url: str, comment_content: str, reply_text: str) -> str:
         """Reply to a specific Reddit comment"""
+        _, message = await self.reply_to_comment_result(url, comment_content, reply_text)
+        return message
+    
+    @service_mcp.on_browser_loop
+    async def reply_to_comment_result(self, url: str, comment_content: str, reply_text: str) -> Tuple[bool, str]:
+        """Reply to a specific Reddit comment, returning (success, message)"""
         login_status = await self.ensure_browser()
         if not login_status:
-            return "Please login to Reddit account first to reply to comments"
+            return False, "Please login to Reddit account first to reply to comments"
         
         if not self.main_page:
-            return "Browser page not initialized, please retry"
+            return False, "Browser page not initialized, please retry"
+        
+        if REDDIT_API_REPLIES:
+            result = await self._reply_via_api(url, comment_content, reply_text)
+            if result is not None:
+                return result
         
         try:
             # Visit post link
             await self.main_page.goto(url, timeout=60000, wait_until="domcontentloaded")
-            await asyncio.sleep(2)
-            
-            # Find comment containing the specified content
-            comment_found = False
+            try:
+                await self.main_page.wait_for_function(_COMMENTS_READY_JS, arg=_COMMENTS_READY_SELECTOR, timeout=5000)
+            except Exception:
+                pass  # The comment lookup reports if nothing rendered
             
             # Use shared utility to find and reply to comment
-            comment_container_selector = 'shreddit-comment, .Comment, [class*="comment"]'
-            reply_button_selectors = [
-                'button:has-text("Reply")',
-                'button[aria-label*="reply"]',
-                'text="Reply"'
-            ]
-            reply_input_selectors = [
-                'div[contenteditable="true"]',
-                'textarea[placeholder*="comment"]',
-                'text="Add a comment..."',
-            ]
-            reply_submit_selectors = [
-                'button:has-text("Comment")',
-                'button:has-text("Reply")',
-                'button[type="submit"]',
-            ]
-            
-            success, message = await service_mcp.find_and_reply_to_comment(
+            return await service_mcp.find_and_reply_to_comment(
                 page=self.main_page,
                 comment_content=comment_content,
                 reply_text=reply_text,
-                comment_container_selector=comment_container_selector,
-                reply_button_selectors=reply_button_selectors,
-                reply_input_selectors=reply_input_selectors,
-                reply_submit_selectors=reply_submit_selectors
+                comment_container_selector=_COMMENT_CONTAINER_SELECTOR,
+                reply_button_selectors=_REPLY_BUTTON_SELECTORS,
+                reply_input_selectors=_REPLY_INPUT_SELECTORS,
+                reply_submit_selectors=_REPLY_SUBMIT_SELECTORS
             )
+        
+        except Exception as e:
+            return False, f"Error replying to comment: {str(e)}"
+    
+    async def _get_api_token(self) -> Optional[str]:
+        """Return a Reddit API bearer token (password grant), reused until shortly before it expires"""
+        if self._api_token and time.monotonic() < self._api_token_expires:
+            return self._api_token
+        if not (REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET and REDDIT_USERNAME and REDDIT_PASSWORD):
+            return None
+        
+        credentials = base64.b64encode(f"{REDDIT_CLIENT_ID}:{REDDIT_CLIENT_SECRET}".encode()).decode()
+        response = await self.browser_context.request.post(
+            "https://www.reddit.com/api/v1/access_token",
+            form={"grant_type": "password", "username": REDDIT_USERNAME, "password": REDDIT_PASSWORD},
+            headers={"Authorization": f"Basic {credentials}", "User-Agent": REDDIT_USER_AGENT},
+            timeout=15000
+        )
+        data = await response.json() if response.ok else {}
+        token = data.get("access_token")
+        if not token:
+            logger.debug("Reddit API token request failed (HTTP %s)", response.status)
+            return None
+        self._api_token = token
+        self._api_token_expires = time.monotonic() + float(data.get("expires_in", 3600)) - 60
+        return token
+    
+    async def _reply_via_api(self, url: str, comment_content: str, reply_text: str) -> Optional[Tuple[bool, str]]:
+        """Reply through the Reddit API, returning (success, message)
+        
+        Returns None only when the reply was not sent (no token, or the comment is
+        not in the post's .json listing), so the browser flow can run instead. Once
+        the request is sent its outcome is final: falling back could post twice.
+        The comment is found by the same case-insensitive substring match the
+        browser flow uses.
+        """
+        if self.browser_context is None:
+            return None
+        try:
+            token = await self._get_api_token()
+            if token is None:
+                return None
             
-            return message
+            needle = comment_content.strip().lower()
+            listing = await self._get_comment_listing(url) or []
+            thing_id = next(
+                (data.get("name") for data in listing if needle in (data.get("body") or "").lower()), None
+            )
+            if not thing_id:
+                return None
+        except Exception as e:
+            logger.debug("Reddit API reply unavailable for %s: %s", url, e)
+            return None
         
+        try:
+            response = await self.browser_context.request.post(
+                "https://oauth.reddit.com/api/comment",
+                form={"api_type": "json", "thing_id": thing_id, "text": reply_text},
+                headers={"Authorization": f"bearer {token}", "User-Agent": REDDIT_USER_AGENT},
+                timeout=15000
+            )
         except Exception as e:
-            return f"Error replying to comment: {str(e)}"
+            return False, f"Error replying to comment: {str(e)}"
+        
+        errors = None
+        if response.ok:
+            try:
+                errors = (await response.json()).get("json", {}).get("errors")
+            except Exception:
+                pass  # Accepted without a readable body; treat as posted
+        if not response.ok or errors:
+            return False, f"Error replying to comment: HTTP {response.status} {errors or ''}".rstrip()
+        return True, f"Successfully replied to comment: {reply_text}"
     
     def get_search_url(self, keywords: str) -> str:
         """Get Reddit search URL for given keywords"""
@@ -908,11 +1150,10 @@ Be strict - only say YES if it's clearly related to our product and not a compet
     async def _generate_smart_comment(self, post_content: dict, comment_type: str) -> str:
         """Generate smart comment based on post content and comment type (uses shared utility)"""
         title = post_content.get("Title", "")
-        content = post_content.get("Content", "")
         author = post_content.get("Author", "")
         
-        # Use shared utility to detect domain
-        detected_domains = service_mcp.detect_content_domain(title, content)
+        # Use shared utility to detect domain (memoized on the post dict)
+        detected_domains = service_mcp.get_or_detect_domain(post_content)
         domain = detected_domains[0] if detected_domains else "lifestyle"
         
         # Use shared utility to generate comment template
@@ -2,17 +2,51 @@
 Shared utilities for browser management and LLM calls
 All platform-specific code has been moved to platform classes (e.g., RedditPlatform)
 """
-from typing import Any, List, Dict, Optional, Tuple
+from typing import Any, Callable, List, Dict, Optional, Sequence, Tuple
 import sys
 import platform as platform_module
 import asyncio
 import os
 import re
 import random
+import functools
+import weakref
+import threading
+import time
+import contextlib
+import json
+import logging
+import types
+import atexit
+import hashlib
+import inspect
+import math
+import sqlite3
+from urllib.parse import urlsplit, urlunsplit
 from playwright.async_api import async_playwright, Page, Locator
 from fastmcp import FastMCP
 from dotenv import load_dotenv
 
+# LLM provider SDKs are optional; only the one selected by LLM_PROVIDER is needed
+try:
+    from openai import AsyncOpenAI
+except ImportError:
+    AsyncOpenAI = None
+try:
+    from anthropic import AsyncAnthropic
+except ImportError:
+    AsyncAnthropic = None
+try:
+    from google import genai
+except ImportError:
+    genai = None
+
+# Optional faster JSON parser (pip install orjson); falls back to the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Fix for Windows asyncio event loop policy
 # Windows default ProactorEventLoop doesn't support subprocess operations properly
 if platform_module.system() == "Windows":
@@ -26,6 +60,16 @@ if platform_module.system() == "Windows":
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+def configure_logging():
+    """Set the root log level from LOG_LEVEL (DEBUG shows per-stage [TIMING] lines)
+    
+    Called by the entry points (MCP server, backend startup) rather than at import,
+    so importing this module leaves the root logger alone.
+    """
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
 # Initialize FastMCP server (for backward compatibility with MCP clients)
 mcp = FastMCP("reddit_scraper")
 
@@ -37,12 +81,15 @@ DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 os.makedirs(BROWSER_DATA_DIR, exist_ok=True)
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# Saved cookies + localStorage (replaces loading a full Chromium profile on every start)
+STORAGE_STATE_PATH = os.path.join(BROWSER_DATA_DIR, "storage_state.json")
+
 # Store browser context to share between different platforms and methods
+browser = None
 browser_context = None
 main_page = None
 is_logged_in = False  # Note: This is platform-specific but kept here for backward compatibility
 playwright_instance = None
-current_loop_id = None  # Store event loop ID
 
 # LLM Configuration
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama")  # "openai", "gemini", "anthropic" or "ollama"
@@ -51,137 +98,488 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://10.10.10.217:11434/v1")  # Ollama server address (needs /v1 path)
 LLM_MODEL = os.getenv("LLM_MODEL", "Qwen2")  # Default model name
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))  # Max provider requests in flight per event loop
+
+# Page pool configuration for concurrent scraping (see PagePool)
+PAGE_POOL_SIZE = int(os.getenv("PAGE_POOL_SIZE", "8"))  # Max pages open for scraping at once
+PAGE_MAX_USES = int(os.getenv("PAGE_MAX_USES", "50"))  # Recycle a page after this many URLs
+PAGE_MAX_AGE_SECONDS = float(os.getenv("PAGE_MAX_AGE_SECONDS", "600"))  # Recycle a page after this long
+
+# Delay per keystroke when typing comments; 0 inserts the whole text at once
+HUMAN_TYPING_DELAY_MS = float(os.getenv("HUMAN_TYPING_DELAY_MS", "0"))
+
+# Request blocking is opt-in: Playwright turns off the HTTP cache for a context once
+# routing is enabled, so aborting assets can cost more than it saves on repeat loads
+BLOCK_RESOURCES = os.getenv("BLOCK_RESOURCES", "false").lower() == "true"
+# Stylesheets are opt-in: visibility checks and clicks in the comment/reply flows need layout
+BLOCK_STYLESHEETS = os.getenv("BLOCK_STYLESHEETS", "false").lower() == "true"
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "texttrack", "manifest"}
+                                    | ({"stylesheet"} if BLOCK_STYLESHEETS else set()))
+_BLOCKED_URL_FRAGMENTS = ("google-analytics", "googletagmanager", "doubleclick", "adservice")
+
+# Playwright captures inspect.stack() on every API call (for trace metadata), which
+# looks up source files for each frame; on scraping paths that dominates CPU time
+PLAYWRIGHT_FAST_STACKS = os.getenv("PLAYWRIGHT_FAST_STACKS", "true").lower() != "false"
+
+def _fast_stack(context: int = 1) -> List[inspect.FrameInfo]:
+    """inspect.stack() without source file lookups (no code_context)"""
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        frames.append(inspect.FrameInfo(frame, frame.f_code.co_filename, frame.f_lineno,
+                                        frame.f_code.co_name, None, None))
+        frame = frame.f_back
+    return frames
+
+class _FastStackInspect(types.ModuleType):
+    """Stand-in for the inspect module whose stack() is _fast_stack"""
+    stack = staticmethod(_fast_stack)
+    
+    def __getattr__(self, name):
+        return getattr(inspect, name)
+
+if PLAYWRIGHT_FAST_STACKS:
+    try:
+        # Private module: if a Playwright release moves this, the patch is simply skipped
+        from playwright._impl import _connection as _playwright_connection
+        if getattr(_playwright_connection, "inspect", None) is inspect:
+            _playwright_connection.inspect = _FastStackInspect("inspect")
+    except ImportError:
+        pass
+
+# Scrape result cache (memory + SQLite under DATA_DIR); TTLs in seconds, 0 disables
+SCRAPE_CACHE_PATH = os.path.join(DATA_DIR, "scrape_cache.sqlite3")
+POST_CACHE_TTL = float(os.getenv("POST_CACHE_TTL", "21600"))  # Post bodies rarely change
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "900"))  # Search rankings drift faster
+
+# LLM response cache: exact-match tier (on by default) and optional semantic tier
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))  # Seconds, 0 disables caching
+LLM_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("LLM_SEMANTIC_CACHE_THRESHOLD", "0"))  # e.g. 0.92; 0 disables
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text" if LLM_PROVIDER == "ollama" else "text-embedding-3-small")
+# Entries kept per scope; the least recently used entry is evicted first
+LLM_SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("LLM_SEMANTIC_CACHE_MAX_ENTRIES", "512"))
+
+# Normalized prompt embeddings per (provider, model, system prompt, max_tokens) scope
+_semantic_index: Dict[str, List[Tuple[List[float], str]]] = {}
 
-async def _call_llm(prompt: str, system_prompt: str = "", max_tokens: int = 500) -> str:
+_semantic_index_loaded = False
+
+def _load_semantic_index():
+    """Fill _semantic_index from semantic_cache on first use (newest entries per scope)"""
+    global _semantic_index_loaded
+    if _semantic_index_loaded:
+        return
+    _semantic_index_loaded = True
+    for _, (scope, embedding, response) in semantic_cache.items(LLM_CACHE_TTL):
+        entries = _semantic_index.setdefault(scope, [])
+        if len(entries) >= LLM_SEMANTIC_CACHE_MAX_ENTRIES:
+            del entries[0]
+        entries.append((embedding, response))
+
+# Provider calls in flight, by (event loop id, cache key)
+_llm_inflight: Dict[Tuple[int, str], "asyncio.Future[str]"] = {}
+
+def _llm_cache_key(prompt: str, system_prompt: str, max_tokens: int, json_mode: bool) -> Tuple[str, str]:
+    """Return the (scope, llm_cache key) of a request"""
+    scope = json.dumps([LLM_PROVIDER, LLM_MODEL, system_prompt, max_tokens, json_mode])
+    # Scraped text and pasted product descriptions vary in spacing and line breaks;
+    # collapse whitespace so such repeats share one entry
+    key = hashlib.blake2b(
+        json.dumps([scope, " ".join(prompt.split())]).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return scope, key
+
+async def _call_llm(prompt: str, system_prompt: str = "", max_tokens: int = 500, json_mode: bool = False,
+                    use_cache: bool = True) -> str:
     """Call LLM API (shared utility for all platforms)
     
+    Identical requests (ignoring differences in whitespace) are answered from
+    llm_cache for LLM_CACHE_TTL seconds.
+    With LLM_SEMANTIC_CACHE_THRESHOLD set, a prompt whose embedding is at least
+    that cosine-similar to a cached one reuses its response (embeddings are kept
+    in semantic_cache, so this survives restarts too). Identical requests
+    made while one is still running wait for that response instead of sending
+    their own.
+    
     Args:
         prompt: User prompt
         system_prompt: System prompt
         max_tokens: Maximum number of tokens
+        json_mode: Ask OpenAI-compatible providers for a JSON object response
+        use_cache: Skip both cache tiers when False (for callers that validate and cache themselves)
     
     Returns:
         Text returned by LLM
     """
-    try:
-        if LLM_PROVIDER == "gemini":
-            # Import google genai (install with: pip install google-genai)
-            try:
-                from google import genai
-            except ImportError:
-                raise ImportError("google-genai package not installed. Install with: pip install google-genai")
-            
-            if not GEMINI_API_KEY:
-                raise ValueError("GEMINI_API_KEY environment variable not set")
-            
-            # Set GEMINI_API_KEY in environment if not already set
-            if not os.getenv("GEMINI_API_KEY"):
-                os.environ["GEMINI_API_KEY"] = GEMINI_API_KEY
-            
-            # The client gets the API key from the environment variable `GEMINI_API_KEY`
-            client = genai.Client()
-            
-            # Set model name (default to gemini-2.5-flash if not specified)
-            # Common models: gemini-2.5-flash, gemini-1.5-pro, gemini-1.5-flash
-            model_name = LLM_MODEL if LLM_MODEL and "gemini" in LLM_MODEL.lower() else "gemini-2.5-flash"
-            
-            # Combine system prompt and user prompt
-            # Gemini doesn't have a separate system parameter, so we combine them
-            if system_prompt:
-                full_prompt = f"{system_prompt}\n\n{prompt}"
-            else:
-                full_prompt = prompt
-            
-            # Generate content
-            # Note: Gemini API is synchronous, so we run it in executor to make it async-compatible
-            response = client.models.generate_content(
-                model=model_name, contents=full_prompt
-            )
-            
-            return response.text
-        
-        elif LLM_PROVIDER == "anthropic":
-            from anthropic import AsyncAnthropic
-            
-            if not ANTHROPIC_API_KEY:
-                raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-            
-            client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
-            
-            # Anthropic uses system parameter instead of adding system role in messages
-            model_name = LLM_MODEL if "claude" in LLM_MODEL.lower() else "claude-3-5-sonnet-20241022"
-            
-            if system_prompt:
-                response = await client.messages.create(
-                    model=model_name,
-                    max_tokens=max_tokens,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-            else:
-                response = await client.messages.create(
-                    model=model_name,
-                    max_tokens=max_tokens,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-            
-            return response.content[0].text
-        
-        elif LLM_PROVIDER == "ollama":
-            # Use Ollama server
-            from openai import AsyncOpenAI
-            
+    if LLM_CACHE_TTL <= 0 or not use_cache:
+        return await _call_llm_provider(prompt, system_prompt, max_tokens, json_mode)
+    
+    scope, key = _llm_cache_key(prompt, system_prompt, max_tokens, json_mode)
+    cached = llm_cache.get(key, LLM_CACHE_TTL)
+    if cached is not None:
+        return cached
+    
+    # Concurrent identical requests share one provider call. Shielded, so a caller
+    # that is cancelled does not cancel the request for the others
+    inflight_key = (id(asyncio.get_running_loop()), key)
+    pending = _llm_inflight.get(inflight_key)
+    if pending is None:
+        pending = asyncio.ensure_future(_call_llm_uncached(prompt, system_prompt, max_tokens, json_mode, scope, key))
+        _llm_inflight[inflight_key] = pending
+        pending.add_done_callback(lambda _: _llm_inflight.pop(inflight_key, None))
+    return await asyncio.shield(pending)
+
+async def _call_llm_uncached(prompt: str, system_prompt: str, max_tokens: int, json_mode: bool,
+                             scope: str, key: str) -> str:
+    """Semantic tier and provider call for _call_llm after an exact-cache miss"""
+    embedding = None
+    if LLM_SEMANTIC_CACHE_THRESHOLD > 0:
+        _load_semantic_index()
+        embedding = await _embed_prompt(prompt)
+        if embedding is not None:
+            entries = _semantic_index.get(scope, [])
+            best_score, best_index = 0.0, -1
+            for i, (vector, _) in enumerate(entries):
+                score = sum(a * b for a, b in zip(vector, embedding))
+                if score > best_score:
+                    best_score, best_index = score, i
+            if best_score >= LLM_SEMANTIC_CACHE_THRESHOLD:
+                # Move the hit to the end so eviction drops the least recently used entry
+                entry = entries.pop(best_index)
+                entries.append(entry)
+                return entry[1]
+    
+    response = await _call_llm_provider(prompt, system_prompt, max_tokens, json_mode)
+    if response:  # Failed calls return "" and are not cached
+        llm_cache.set(key, response)
+        if embedding is not None:
+            entries = _semantic_index.setdefault(scope, [])
+            if len(entries) >= LLM_SEMANTIC_CACHE_MAX_ENTRIES:
+                del entries[0]
+            entries.append((embedding, response))
+            semantic_cache.set(key, [scope, embedding, response])
+    return response
+
+# Provider clients reused across calls (keeps their HTTP connection pools warm).
+# httpx pools are bound to an event loop and calls come from both the server loop
+# and the browser loop, so there is one client per (kind, event loop)
+_LLM_CLIENTS: Dict[Tuple[str, int], Any] = {}
+
+def _get_llm_client(kind: str) -> Any:
+    """Return the shared client for "openai", "ollama", "anthropic" or "gemini" """
+    client_key = (kind, id(asyncio.get_running_loop()))
+    client = _LLM_CLIENTS.get(client_key)
+    if client is not None:
+        return client
+    
+    if kind == "gemini":
+        if genai is None:
+            raise ImportError("google-genai package not installed. Install with: pip install google-genai")
+        # The client gets the API key from the environment variable `GEMINI_API_KEY`
+        client = genai.Client()
+    elif kind == "anthropic":
+        if AsyncAnthropic is None:
+            raise ImportError("anthropic package not installed. Install with: pip install anthropic")
+        client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    else:
+        if AsyncOpenAI is None:
+            raise ImportError("openai package not installed. Install with: pip install openai")
+        if kind == "ollama":
             # Ollama uses OpenAI-compatible API but doesn't need API Key
-            # Set base_url to point to Ollama server
-            client = AsyncOpenAI(
-                base_url=OLLAMA_BASE_URL,
-                api_key="ollama"  # Ollama doesn't need real API Key but requires a value
-            )
-            
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
-            
-            # Ollama model name, use default if not set
-            model_name = LLM_MODEL if LLM_MODEL else "llama2"
-            
-            response = await client.chat.completions.create(
-                model=model_name,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
-        
-        else:  # Default to OpenAI
-            from openai import AsyncOpenAI
-            
-            if not OPENAI_API_KEY:
-                raise ValueError("OPENAI_API_KEY environment variable not set")
-            
+            client = AsyncOpenAI(base_url=OLLAMA_BASE_URL, api_key="ollama")
+        else:
             client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-            
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
-            
-            response = await client.chat.completions.create(
-                model=LLM_MODEL,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
     
+    _LLM_CLIENTS[client_key] = client
+    return client
+
+async def _call_llm_multi(
+    items: List[Dict[str, Any]],
+    per_item_template: str,
+    system_prompt: str = "",
+    max_tokens_per_item: int = 200
+) -> List[str]:
+    """Process several items with one LLM call instead of one call per item (shared utility)
+    
+    Each item is rendered with per_item_template.format(**item) into a numbered
+    section, and the model is asked for one result per item in a JSON object.
+    
+    Args:
+        items: Template fields for each item
+        per_item_template: Format string applied to every item
+        system_prompt: System prompt
+        max_tokens_per_item: Token budget per item (the call gets this times len(items))
+    
+    Returns:
+        One result string per item, in order ("" where the model gave none or the call failed)
+    """
+    if not items:
+        return []
+    
+    body = "\n\n".join(
+        f"### Item {i}\n{per_item_template.format(**item)}" for i, item in enumerate(items, 1)
+    )
+    prompt = (
+        f"{body}\n\nReturn a JSON object of the form {{\"results\": [...]}} where \"results\" "
+        f"holds exactly {len(items)} strings, the result for each item in order."
+    )
+    max_tokens = max_tokens_per_item * len(items)
+    # Only responses that parse are cached: a truncated or prose-wrapped reply
+    # would otherwise replay its parse failure for every repeat of the batch
+    _, key = _llm_cache_key(prompt, system_prompt, max_tokens, True)
+    cached = llm_cache.get(key, LLM_CACHE_TTL)
+    raw = cached if cached is not None else await _call_llm(
+        prompt, system_prompt, max_tokens=max_tokens, json_mode=True, use_cache=False
+    )
+    
+    results: List[str] = []
+    try:
+        # Tolerate code fences or text around the JSON
+        parsed = _parse_json_object(raw)
+        values = parsed.get("results") if isinstance(parsed, dict) else None
+        if isinstance(values, list):
+            results = [value if isinstance(value, str) else json.dumps(value) for value in values]
+            if cached is None and LLM_CACHE_TTL > 0:
+                llm_cache.set(key, raw)
+    except ValueError:
+        logger.warning("LLM multi-item response was not valid JSON: %s", raw[:200])
+    
+    return (results + [""] * len(items))[:len(items)]
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text (braces inside strings are skipped)"""
+    start = text.find("{")
+    if start == -1:
+        return None
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+def _parse_json_object(text: str) -> Any:
+    """Parse the first JSON object embedded in an LLM response (None if there is none)
+    
+    Raises ValueError if the object is not valid JSON.
+    """
+    candidate = _extract_json_object(text)
+    if candidate is None:
+        return None
+    return orjson.loads(candidate) if orjson is not None else json.loads(candidate)
+
+async def _embed_prompt(text: str) -> Optional[List[float]]:
+    """Return the unit-length embedding of text, or None if unavailable
+    
+    Only the OpenAI-compatible providers (openai, ollama) expose embeddings here.
+    """
+    if LLM_PROVIDER in ("gemini", "anthropic"):
+        return None
+    try:
+        client = _get_llm_client("ollama" if LLM_PROVIDER == "ollama" else "openai")
+        response = await client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        vector = response.data[0].embedding
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector] if norm else None
+    except Exception as e:
+        logger.warning("Embedding error: %s", e)
+        return None
+
+async def _llm_gemini(prompt: str, system_prompt: str, max_tokens: int, json_mode: bool) -> str:
+    """Gemini handler for _call_llm_provider"""
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY environment variable not set")
+    
+    # Set GEMINI_API_KEY in environment if not already set
+    if not os.getenv("GEMINI_API_KEY"):
+        os.environ["GEMINI_API_KEY"] = GEMINI_API_KEY
+    
+    client = _get_llm_client("gemini")
+    
+    # Set model name (default to gemini-2.5-flash if not specified)
+    # Common models: gemini-2.5-flash, gemini-1.5-pro, gemini-1.5-flash
+    model_name = LLM_MODEL if LLM_MODEL and "gemini" in LLM_MODEL.lower() else "gemini-2.5-flash"
+    
+    # Combine system prompt and user prompt
+    # Gemini doesn't have a separate system parameter, so we combine them
+    if system_prompt:
+        full_prompt = f"{system_prompt}\n\n{prompt}"
+    else:
+        full_prompt = prompt
+    
+    # Generate content
+    # Note: Gemini API is synchronous, so we run it in executor to make it async-compatible
+    response = await asyncio.get_running_loop().run_in_executor(
+        None,
+        functools.partial(client.models.generate_content, model=model_name, contents=full_prompt)
+    )
+    
+    return response.text
+
+async def _llm_anthropic(prompt: str, system_prompt: str, max_tokens: int, json_mode: bool) -> str:
+    """Anthropic handler for _call_llm_provider"""
+    if not ANTHROPIC_API_KEY:
+        raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+    
+    client = _get_llm_client("anthropic")
+    
+    # Anthropic uses system parameter instead of adding system role in messages
+    model_name = LLM_MODEL if "claude" in LLM_MODEL.lower() else "claude-3-5-sonnet-20241022"
+    
+    if system_prompt:
+        response = await client.messages.create(
+            model=model_name,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[{"role": "user", "content": prompt}]
+        )
+    else:
+        response = await client.messages.create(
+            model=model_name,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+    
+    return response.content[0].text
+
+async def _llm_ollama(prompt: str, system_prompt: str, max_tokens: int, json_mode: bool) -> str:
+    """Ollama handler for _call_llm_provider (OpenAI-compatible API at OLLAMA_BASE_URL)"""
+    client = _get_llm_client("ollama")
+    
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    
+    # Ollama model name, use default if not set
+    model_name = LLM_MODEL if LLM_MODEL else "llama2"
+    
+    response = await client.chat.completions.create(
+        model=model_name,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=0.7,
+        **_json_mode_kwargs(json_mode)
+    )
+    
+    return response.choices[0].message.content
+
+async def _llm_openai(prompt: str, system_prompt: str, max_tokens: int, json_mode: bool) -> str:
+    """OpenAI handler for _call_llm_provider (also the default)"""
+    if not OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+    
+    client = _get_llm_client("openai")
+    
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    
+    response = await client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=0.7,
+        **_json_mode_kwargs(json_mode)
+    )
+    
+    return response.choices[0].message.content
+
+def _json_mode_kwargs(json_mode: bool) -> Dict[str, Any]:
+    """JSON mode is an OpenAI-compatible option; other providers follow the prompt's instructions"""
+    return {"response_format": {"type": "json_object"}} if json_mode else {}
+
+# LLM_PROVIDER -> request handler, resolved once per call instead of an if/elif chain
+_PROVIDER_HANDLERS: Dict[str, Callable[..., Any]] = {
+    "openai": _llm_openai,
+    "ollama": _llm_ollama,
+    "gemini": _llm_gemini,
+    "anthropic": _llm_anthropic,
+}
+
+# Semaphores bounding concurrent provider requests; like the clients, one per event loop
+_LLM_SEMAPHORES: Dict[int, asyncio.Semaphore] = {}
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    """Return the LLM_CONCURRENCY semaphore for the running event loop"""
+    loop_id = id(asyncio.get_running_loop())
+    semaphore = _LLM_SEMAPHORES.get(loop_id)
+    if semaphore is None:
+        semaphore = _LLM_SEMAPHORES[loop_id] = asyncio.Semaphore(LLM_CONCURRENCY)
+    return semaphore
+
+async def _call_llm_provider(prompt: str, system_prompt: str = "", max_tokens: int = 500,
+                             json_mode: bool = False) -> str:
+    """Send one request to the configured LLM provider (uncached)
+    
+    At most LLM_CONCURRENCY requests run at once per event loop, so large
+    gathered batches queue here instead of flooding the provider.
+    """
+    handler = _PROVIDER_HANDLERS.get(LLM_PROVIDER, _llm_openai)
+    try:
+        async with _get_llm_semaphore():
+            return await handler(prompt, system_prompt, max_tokens, json_mode)
     except Exception as e:
         print(f"LLM call error: {str(e)}")
         # If LLM call fails, return empty string for caller to handle
         return ""
 
+async def _route_request(route):
+    """Abort images, fonts, media, caption tracks, manifests and tracker requests
+    (plus stylesheets with BLOCK_STYLESHEETS); let everything else through"""
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(
+        fragment in request.url for fragment in _BLOCKED_URL_FRAGMENTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+# Playwright objects are bound to the loop that created them, so all browser work
+# runs on one long-lived loop in a daemon thread and other loops submit to it
+_browser_loop: Optional[asyncio.AbstractEventLoop] = None
+_browser_loop_lock = threading.Lock()
+
+def _get_browser_loop() -> asyncio.AbstractEventLoop:
+    """Return the browser event loop, starting its thread on first use"""
+    global _browser_loop
+    with _browser_loop_lock:
+        if _browser_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="playwright-loop", daemon=True).start()
+            _browser_loop = loop
+    return _browser_loop
+
+async def run_on_browser_loop(coro):
+    """Await coro on the browser loop (directly when already running there) (shared utility)"""
+    loop = _get_browser_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+def on_browser_loop(func):
+    """Decorator running an async function or method on the browser loop (shared utility)"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_on_browser_loop(func(*args, **kwargs))
+    return wrapper
+
+@on_browser_loop
 async def ensure_browser():
     """Ensure browser is started (shared utility for all platforms)
     
@@ -191,149 +589,420 @@ async def ensure_browser():
     Returns:
         bool: True if browser is ready, False if login is needed
     """
-    global browser_context, main_page, is_logged_in, playwright_instance, current_loop_id
+    global browser, browser_context, main_page, playwright_instance
     
-    # Get current event loop ID
-    try:
-        loop = asyncio.get_running_loop()
-        loop_id = id(loop)
-    except RuntimeError:
-        loop = asyncio.get_event_loop()
-        loop_id = id(loop)
-    
-    # If browser context doesn't exist or event loop changed, recreate it
-    if browser_context is None or current_loop_id != loop_id:
-        # If old browser context exists and event loop changed, mark as invalid but don't close
-        # Note: For persistent context, we shouldn't close it as it may be used by other processes
-        # We just set reference to None, let new calls create new context
-        if browser_context is not None and current_loop_id is not None and current_loop_id != loop_id:
-            # Don't close persistent context, just clear reference
-            # Persistent context will be automatically managed when no references exist
-            browser_context = None
-            main_page = None
-            is_logged_in = False
-        
-        # Note: Don't stop playwright_instance because:
-        # 1. Persistent context needs playwright_instance to manage browser process
-        # 2. Stopping playwright_instance will close all related browser processes
-        # 3. We just need to create new playwright_instance, old one will be garbage collected
-        # If playwright_instance exists but event loop changed, create new instance
-        if playwright_instance is not None and current_loop_id is not None and current_loop_id != loop_id:
-            # Don't stop old instance, let it continue managing browser process
-            # Create new instance for new connection
-            playwright_instance = None
-            browser_context = None
-            main_page = None
-            is_logged_in = False
-        
-        
+    # Runs on the dedicated browser loop (see on_browser_loop), so the browser
+    # started here stays valid no matter which loop the caller is on
+    if browser_context is None:
         # Start browser
         playwright_instance = await async_playwright().start()
         
-        # Use persistent context to save user state
-        # Note: Persistent context will reuse same browser process even if previous context was "closed"
-        # If previous browser is still running, launch_persistent_context will connect to existing browser
+        # Plain browser + context restored from the saved storage state (login cookies)
         try:
-            browser_context = await playwright_instance.chromium.launch_persistent_context(
-                user_data_dir=BROWSER_DATA_DIR,
+            browser = await playwright_instance.chromium.launch(
                 headless=False,  # Non-headless mode for user login convenience
-                viewport={"width": 1280, "height": 800},
+                args=["--disable-dev-shm-usage", "--disable-gpu"],
                 timeout=60000
             )
         except Exception as e:
-            error_msg = str(e)
-            # If error is because browser was already closed, wait and retry
-            if "closed" in error_msg.lower() or "Target page" in error_msg or "not found" in error_msg.lower():
-                await asyncio.sleep(3)  # Wait for browser process to fully close
-                try:
-                    browser_context = await playwright_instance.chromium.launch_persistent_context(
-                        user_data_dir=BROWSER_DATA_DIR,
-                        headless=False,
-                        viewport={"width": 1280, "height": 800},
-                        timeout=60000
-                    )
-                except Exception as e2:
-                    raise Exception(f"Unable to start browser. If problem persists, close all browser windows and retry. Error: {str(e2)}")
-            else:
-                raise
+            raise Exception(f"Unable to start browser. Make sure Chromium is installed (playwright install chromium). Error: {str(e)}")
+        # Service workers are blocked: requests they make bypass the route handler below
+        browser_context = await browser.new_context(
+            viewport={"width": 1280, "height": 800},
+            storage_state=STORAGE_STATE_PATH if os.path.exists(STORAGE_STATE_PATH) else None,
+            service_workers="block"
+        )
         
-        # Record current event loop ID
-        current_loop_id = loop_id
+        # Skip asset downloads for every page in the context (opt in with BLOCK_RESOURCES=true)
+        await browser_context.set_extra_http_headers({"Accept-Language": "en-US,en;q=0.9"})
+        if BLOCK_RESOURCES:
+            await browser_context.route("**/*", _route_request)
         
         # Create a new page
-        if browser_context.pages:
-            main_page = browser_context.pages[0]
-            if main_page is None:
-                main_page = await browser_context.new_page()
-        else:
-            main_page = await browser_context.new_page()
+        main_page = await browser_context.new_page()
         
         # Set page-level timeout
         main_page.set_default_timeout(60000)
+    elif main_page is None or main_page.is_closed():
+        # The main tab was closed (e.g. by the user); the context itself is still usable
+        main_page = await browser_context.new_page()
+        main_page.set_default_timeout(60000)
     
     # Note: Login checking is platform-specific and should be handled by platform classes
     # This function just ensures the browser is ready
     
     return True
 
+@on_browser_loop
+async def save_browser_state():
+    """Save the shared context's cookies and localStorage to STORAGE_STATE_PATH (shared utility)
+    
+    Call after a successful login so later starts restore the session.
+    """
+    if browser_context is not None:
+        await browser_context.storage_state(path=STORAGE_STATE_PATH)
+
+def _save_browser_state_at_exit():
+    """Persist the session on interpreter shutdown (the browser loop thread is still alive)"""
+    if browser_context is None or _browser_loop is None or not _browser_loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(save_browser_state(), _browser_loop).result(timeout=5)
+    except Exception as e:
+        logger.warning("Could not save browser state: %s", e)
+
+atexit.register(_save_browser_state_at_exit)
+
+class PagePool:
+    """Bounded pool of scraping pages in the shared browser context
+    
+    Pages share the browser context (and therefore the login session), so
+    several URLs can load in parallel without separate browser profiles. Each
+    page is closed and replaced after max_uses URLs or max_age_seconds to keep
+    Chromium's per-page memory growth in check.
+    """
+    
+    def __init__(self, context, size: int = PAGE_POOL_SIZE, max_uses: int = PAGE_MAX_USES,
+                 max_age_seconds: float = PAGE_MAX_AGE_SECONDS):
+        self.context = context
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age_seconds = max_age_seconds
+        self._semaphore = asyncio.Semaphore(size)
+        self._lock = asyncio.Lock()
+        self._idle: List[Tuple[Page, int, float]] = []  # (page, uses, created_at)
+    
+    @contextlib.asynccontextmanager
+    async def page(self):
+        """Check out a page for the duration of the block"""
+        async with self._semaphore:
+            entry = None
+            async with self._lock:
+                while self._idle and entry is None:
+                    candidate = self._idle.pop()
+                    if not candidate[0].is_closed():
+                        entry = candidate
+            if entry is None:
+                new_page = await self.context.new_page()
+                new_page.set_default_timeout(60000)
+                entry = (new_page, 0, time.monotonic())
+            
+            page, uses, created_at = entry
+            try:
+                yield page
+            finally:
+                uses += 1
+                if uses >= self.max_uses or time.monotonic() - created_at >= self.max_age_seconds:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                elif not page.is_closed():
+                    async with self._lock:
+                        self._idle.append((page, uses, created_at))
+    
+    async def close(self):
+        """Close all idle pages"""
+        async with self._lock:
+            idle, self._idle = self._idle, []
+        for page, _, _ in idle:
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+_page_pool: Optional[PagePool] = None
+
+async def get_page_pool() -> PagePool:
+    """Get the page pool bound to the current shared browser context (shared utility)"""
+    global _page_pool
+    await ensure_browser()
+    if _page_pool is None or _page_pool.context is not browser_context:
+        # Browser context was (re)created; pages from the old one are unusable
+        _page_pool = PagePool(browser_context)
+    return _page_pool
+
+# ============================================================================
+# Shared Scrape Cache (used by all platforms)
+# ============================================================================
+
+def canonicalize_url(url: str) -> str:
+    """Strip query string and fragment so equivalent post URLs share a cache key"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, "", ""))
+
+class ScrapeCache:
+    """TTL cache of scraped payloads: an in-memory dict in front of an SQLite table
+    
+    Payloads are JSON-serializable values. The SQLite copy keeps the cache warm
+    across restarts; the memory copy makes repeat hits within a process free.
+    get() returns the stored object itself, so callers must treat payloads as
+    read-only. Rows older than the table's ttl are deleted when the cache opens
+    and at most every _PRUNE_INTERVAL seconds on set().
+    """
+    
+    _PRUNE_INTERVAL = 3600.0
+    
+    def __init__(self, path: str, table: str, ttl: float, max_memory_entries: int = 1024):
+        self.table = table
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self._memory: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, ts REAL, payload TEXT)"
+            )
+        self._next_prune = 0.0
+        with self._lock:
+            self._prune(time.time())
+    
+    def get(self, key: str, ttl: float) -> Optional[Any]:
+        """Return the cached payload for key if it is younger than ttl seconds"""
+        if ttl <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute(
+                    f"SELECT ts, payload FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                entry = (row[0], json.loads(row[1]))
+                self._remember(key, entry)
+        ts, payload = entry
+        return payload if now - ts < ttl else None
+    
+    def set(self, key: str, payload: Any):
+        """Store payload for key (memory and disk)"""
+        entry = (time.time(), payload)
+        with self._lock:
+            self._remember(key, entry)
+            with self._conn:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, ts, payload) VALUES (?, ?, ?)",
+                    (key, entry[0], json.dumps(payload)),
+                )
+            if entry[0] >= self._next_prune:
+                self._prune(entry[0])
+    
+    def _prune(self, now: float):
+        """Delete rows older than ttl (every row when caching is disabled); caller holds the lock"""
+        self._next_prune = now + self._PRUNE_INTERVAL
+        with self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE ts <= ?", (now - max(self.ttl, 0),))
+    
+    def items(self, ttl: float) -> List[Tuple[str, Any]]:
+        """Return (key, payload) for every stored entry younger than ttl seconds, oldest first"""
+        if ttl <= 0:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, payload FROM {self.table} WHERE ts > ? ORDER BY ts", (time.time() - ttl,)
+            ).fetchall()
+        return [(key, json.loads(payload)) for key, payload in rows]
+    
+    def _remember(self, key: str, entry: Tuple[float, Any]):
+        self._memory.pop(key, None)
+        if len(self._memory) >= self.max_memory_entries:
+            # Dicts keep insertion order, so the first key is the oldest
+            del self._memory[next(iter(self._memory))]
+        self._memory[key] = entry
+
+post_cache = ScrapeCache(SCRAPE_CACHE_PATH, "post_cache", POST_CACHE_TTL)
+search_cache = ScrapeCache(SCRAPE_CACHE_PATH, "search_cache", SEARCH_CACHE_TTL)
+llm_cache = ScrapeCache(SCRAPE_CACHE_PATH, "llm_cache", LLM_CACHE_TTL)
+# Semantic tier entries ([scope, embedding, response] by llm_cache key), reloaded on restart;
+# _semantic_index is their in-memory copy, so this cache keeps almost nothing in memory itself
+semantic_cache = ScrapeCache(SCRAPE_CACHE_PATH, "semantic_cache", LLM_CACHE_TTL, max_memory_entries=1)
+# Intent scores by product and comment text, so a comment that recurs across posts
+# or runs is not scored again when it lands in a different batch
+intent_cache = ScrapeCache(SCRAPE_CACHE_PATH, "intent_cache", LLM_CACHE_TTL)
+
 # ============================================================================
 # Shared Playwright Helper Functions (used by all platforms)
 # ============================================================================
 
-async def find_element_by_selectors(page: Page, selectors: List[str], timeout: int = 3000) -> Optional[Any]:
+# First visible match of the first selector (in priority order) that has one. Stops at
+# the first selector the browser cannot parse (Playwright-only syntax such as text= or
+# :has-text) and returns its index, so the caller continues from there; -1 if none match
+_FIRST_VISIBLE_JS = """(selectors) => {
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    for (let i = 0; i < selectors.length; i++) {
+        let elements;
+        try {
+            elements = document.querySelectorAll(selectors[i]);
+        } catch (e) {
+            return i;
+        }
+        for (const el of elements) {
+            if (visible(el)) return el;
+        }
+    }
+    return -1;
+}"""
+
+async def _first_visible(page: Page, selectors: Sequence[str]) -> Optional[Any]:
+    """First visible element across selectors in priority order
+    
+    Plain CSS selectors are checked together in one page round-trip; from the
+    first Playwright-only selector on, each is queried through Playwright.
+    """
+    selectors = list(selectors)
+    start = 0
+    try:
+        handle = await page.evaluate_handle(_FIRST_VISIBLE_JS, selectors)
+        element = handle.as_element()
+        if element is not None:
+            return element
+        start = await handle.json_value()
+        if start < 0:
+            return None
+    except Exception:
+        start = 0
+    
+    for selector in selectors[start:]:
+        try:
+            for element in await page.query_selector_all(selector):
+                if await element.is_visible():
+                    return element
+        except Exception:
+            continue
+    return None
+
+async def find_element_by_selectors(page: Page, selectors: Sequence[str], timeout: int = 3000) -> Optional[Any]:
     """Find an element using multiple selectors (shared utility)
     
     Args:
         page: Playwright page object
-        selectors: List of CSS selectors to try
+        selectors: CSS selectors to try, in priority order
         timeout: Timeout in milliseconds
     
     Returns:
-        Element if found, None otherwise
+        First visible element of the first selector that has one, None otherwise
     """
-    for selector in selectors:
-        try:
-            element = await page.query_selector(selector)
-            if element:
-                is_visible = await element.is_visible()
-                if is_visible:
-                    return element
-        except Exception:
-            continue
-    return None
+    return await _first_visible(page, selectors)
+
+# For each (selectors, min_length) group, the trimmed text of the first selector whose
+# first match is longer than min_length (null if none); one round-trip for all groups
+_FIRST_TEXT_JS = """(groups) => groups.map(([selectors, minLength]) => {
+    for (const selector of selectors) {
+        const el = document.querySelector(selector);
+        const text = el && el.textContent ? el.textContent.trim() : "";
+        if (text.length > minLength) return text;
+    }
+    return null;
+})"""
 
-async def find_clickable_element(page: Page, selectors: List[str], text_contains: Optional[str] = None) -> Optional[Any]:
+async def get_texts_by_selectors(page: Page, groups: Sequence[Tuple[Sequence[str], int]]) -> List[Optional[str]]:
+    """Get the text of several fields, each from its first matching selector (shared utility)
+    
+    All groups are checked in a single page round-trip.
+    
+    Args:
+        page: Playwright page object
+        groups: (selectors in priority order, min_length) per field; text must be
+            longer than min_length to count as a match
+    
+    Returns:
+        Text per group (None where nothing matched, or for every group on error)
+    """
+    try:
+        return await page.evaluate(_FIRST_TEXT_JS, [[list(selectors), min_length] for selectors, min_length in groups])
+    except Exception:
+        return [None] * len(groups)
+
+async def get_text_by_selectors(page: Page, selectors: Sequence[str], min_length: int = 0) -> Optional[str]:
+    """Get the trimmed text of the first selector that matches (shared utility)
+    
+    All selectors are checked in a single page round-trip instead of a
+    query plus a text read per selector.
+    
+    Args:
+        page: Playwright page object
+        selectors: CSS selectors to try, in priority order
+        min_length: Text must be longer than this to count as a match
+    
+    Returns:
+        Text if found, None otherwise
+    """
+    (text,) = await get_texts_by_selectors(page, [(selectors, min_length)])
+    return text
+
+async def find_clickable_element(page: Page, selectors: Sequence[str], text_contains: Optional[str] = None) -> Optional[Any]:
     """Find a clickable element (button/link) using multiple selectors (shared utility)
     
     Args:
         page: Playwright page object
-        selectors: List of CSS selectors to try
+        selectors: CSS selectors to try
         text_contains: Optional text that element should contain
     
     Returns:
         Element if found, None otherwise
     """
+    if not text_contains:
+        return await _first_visible(page, selectors)
+    
     for selector in selectors:
         try:
+            # Match text in the page for all candidates at once instead of
+            # reading each element's text in its own round-trip
+            index = await page.eval_on_selector_all(
+                selector,
+                "(els, needle) => els.findIndex(el => (el.textContent || '').toLowerCase().includes(needle)"
+                " && el.getClientRects().length > 0)",
+                text_contains.lower()
+            )
+            if index < 0:
+                continue
             elements = await page.query_selector_all(selector)
-            for element in elements:
-                if text_contains:
-                    text = await element.text_content()
-                    if text_contains.lower() in (text or "").lower():
-                        if await element.is_visible():
-                            return element
-                else:
-                    if await element.is_visible():
-                        return element
+            if index < len(elements) and await elements[index].is_visible():
+                return elements[index]
         except Exception:
             continue
     return None
 
+# Playwright engine-prefixed selectors (text=..., xpath=..., //...) cannot be joined into a CSS group
+_ENGINE_SELECTOR_RE = re.compile(r'^\s*(?:[a-zA-Z_-]+=|//|\.\.)')
+
+# True once the focused element accepts typed text (contenteditable, textarea or input)
+_EDITABLE_FOCUSED_JS = """() => {
+    const el = document.activeElement;
+    return !!el && (el.isContentEditable || el.tagName === 'TEXTAREA' || el.tagName === 'INPUT');
+}"""
+
+async def _wait_for_submit_enabled(page: Page, submit_selectors: Sequence[str], timeout: int = 1000):
+    """Wait until the primary submit button is enabled (it is disabled until the
+    editor registers the typed text); gives up quietly after timeout ms"""
+    if not submit_selectors:
+        return
+    try:
+        await page.wait_for_selector(f"{submit_selectors[0]}:not([disabled])", timeout=timeout, state="visible")
+    except Exception:
+        pass  # The submit lookup below copes either way
+
+async def insert_text(page: Page, text: str):
+    """Enter text into the focused input (shared utility)
+    
+    Inserts it in one input event unless HUMAN_TYPING_DELAY_MS asks for
+    key-by-key typing.
+    """
+    if HUMAN_TYPING_DELAY_MS > 0:
+        await page.keyboard.type(text, delay=HUMAN_TYPING_DELAY_MS)
+    else:
+        await page.keyboard.insert_text(text)
+
 async def type_and_submit_comment(
     page: Page,
     comment_text: str,
-    input_selectors: List[str],
-    submit_selectors: List[str],
+    input_selectors: Sequence[str],
+    submit_selectors: Sequence[str],
     scroll_to_selector: Optional[str] = None
 ) -> Tuple[bool, str]:
     """Generic function to type and submit a comment (shared utility)
@@ -355,7 +1024,6 @@ async def type_and_submit_comment(
                 scroll_element = await page.query_selector(scroll_to_selector)
                 if scroll_element:
                     await scroll_element.scroll_into_view_if_needed()
-                    await asyncio.sleep(1)
             except Exception:
                 pass
         
@@ -363,27 +1031,27 @@ async def type_and_submit_comment(
         comment_input = await find_element_by_selectors(page, input_selectors, timeout=3000)
         
         if not comment_input:
-            # Try JavaScript-based finding as fallback
-            comment_input = await page.evaluate('''
+            # Fallback: first input-like element whose own text is a comment prompt.
+            # Only likely candidates are scanned, and only their direct text nodes are
+            # read (textContent on every node of a long thread is a full-tree walk)
+            handle = await page.evaluate_handle('''
                 () => {
-                    const elements = Array.from(document.querySelectorAll('*'))
-                        .filter(el => el.textContent && (
-                            el.textContent.includes('Add a comment') ||
-                            el.textContent.includes('What are your thoughts') ||
-                            el.textContent.includes('Write a comment')
-                        ));
-                    if (elements.length > 0) return elements[0];
-                    const editableDivs = Array.from(document.querySelectorAll('div[contenteditable="true"], textarea[placeholder*="comment"]'));
-                    if (editableDivs.length > 0) return editableDivs[0];
-                    return null;
+                    const prompts = ['Add a comment', 'What are your thoughts', 'Write a comment'];
+                    const candidates = document.querySelectorAll(
+                        'div[contenteditable="true"], textarea, [role="textbox"], button, span, p, label'
+                    );
+                    for (const el of candidates) {
+                        for (const node of el.childNodes) {
+                            if (node.nodeType === Node.TEXT_NODE &&
+                                    prompts.some(prompt => node.nodeValue.includes(prompt))) {
+                                return el;
+                            }
+                        }
+                    }
+                    return document.querySelector('div[contenteditable="true"], textarea[placeholder*="comment"]');
                 }
             ''')
-            
-            if comment_input:
-                # Convert handle to element
-                all_elements = await page.query_selector_all('*')
-                if all_elements:
-                    comment_input = all_elements[-1]  # Fallback
+            comment_input = handle.as_element()
         
         if not comment_input:
             return False, "Unable to find comment input box"
@@ -393,13 +1061,13 @@ async def type_and_submit_comment(
         
         # Wait for input to be focused
         try:
-            await comment_input.wait_for(state="visible", timeout=500)
-        except:
-            await asyncio.sleep(0.2)
+            await page.wait_for_function(_EDITABLE_FOCUSED_JS, timeout=1000)
+        except Exception:
+            pass
         
         # Type comment content
-        await page.keyboard.type(comment_text, delay=30)
-        await asyncio.sleep(0.3)
+        await insert_text(page, comment_text)
+        await _wait_for_submit_enabled(page, submit_selectors)
         
         # Find and click submit button
         submit_button = await find_clickable_element(page, submit_selectors)
@@ -414,7 +1082,7 @@ async def type_and_submit_comment(
         try:
             await page.wait_for_selector(input_selectors[0] if input_selectors else 'text="Add a comment..."', timeout=3000, state="visible")
         except:
-            await asyncio.sleep(1)
+            pass
         
         return True, f"Successfully posted comment: {comment_text[:50]}..."
     
@@ -426,9 +1094,9 @@ async def find_and_reply_to_comment(
     comment_content: str,
     reply_text: str,
     comment_container_selector: str,
-    reply_button_selectors: List[str],
-    reply_input_selectors: List[str],
-    reply_submit_selectors: List[str]
+    reply_button_selectors: Sequence[str],
+    reply_input_selectors: Sequence[str],
+    reply_submit_selectors: Sequence[str]
 ) -> Tuple[bool, str]:
     """Generic function to find a comment and reply to it (shared utility)
     
@@ -436,7 +1104,7 @@ async def find_and_reply_to_comment(
         page: Playwright page object
         comment_content: Content of comment to find
         reply_text: Text to reply with
-        comment_container_selector: Selector for comment containers
+        comment_container_selector: CSS selector for comment containers
         reply_button_selectors: Selectors to find reply button
         reply_input_selectors: Selectors to find reply input box
         reply_submit_selectors: Selectors to find submit button
@@ -445,69 +1113,82 @@ async def find_and_reply_to_comment(
         Tuple of (success: bool, message: str)
     """
     try:
-        # Find all comment elements
-        comment_elements = await page.query_selector_all(comment_container_selector)
+        # Find the first comment containing the text and return a handle to just
+        # that element, in one page round-trip (no handle per comment container).
+        # The needle is normalized once; each container's text is lowercased once
+        handle = await page.evaluate_handle(
+            "([selector, needle]) => Array.from(document.querySelectorAll(selector))"
+            ".find(el => (el.textContent || '').toLowerCase().includes(needle)) || null",
+            [comment_container_selector, comment_content.strip().lower()]
+        )
+        element = handle.as_element()
+        if element is None:
+            return False, f"Comment containing \"{comment_content[:20]}...\" not found, unable to reply"
         
-        for element in comment_elements:
+        # Found matching comment, look for reply button. Within one comment the
+        # selectors can be tried as a single selector group (one round-trip);
+        # the per-selector loop is kept for engine selectors and hidden matches
+        reply_button = None
+        
+        if reply_button_selectors and not any(_ENGINE_SELECTOR_RE.match(sel) for sel in reply_button_selectors):
             try:
-                element_text = await element.text_content()
-                
-                if comment_content.lower() in (element_text or "").lower():
-                    # Found matching comment, look for reply button
-                    reply_button = None
-                    
-                    for selector in reply_button_selectors:
-                        try:
-                            reply_el = await element.query_selector(selector)
-                            if reply_el and await reply_el.is_visible():
-                                reply_button = reply_el
-                                break
-                        except Exception:
-                            continue
-                    
-                    if not reply_button:
-                        return False, "Found comment but unable to find reply button"
-                    
-                    # Click reply button
-                    await reply_button.click()
-                    await asyncio.sleep(0.5)
-                    
-                    # Find reply input box
-                    reply_input = await find_element_by_selectors(page, reply_input_selectors, timeout=2000)
-                    
-                    if not reply_input:
-                        return False, "Found comment but unable to locate reply input box"
-                    
-                    # Click input box and type
-                    await reply_input.click()
-                    try:
-                        await reply_input.wait_for(state="visible", timeout=300)
-                    except:
-                        await asyncio.sleep(0.1)
-                    
-                    await page.keyboard.type(reply_text, delay=30)
-                    await asyncio.sleep(0.3)
-                    
-                    # Submit reply
-                    submit_button = await find_clickable_element(page, reply_submit_selectors)
-                    
-                    if submit_button:
-                        await submit_button.click()
-                    else:
-                        await page.keyboard.press('Enter')
-                    
-                    # Wait for confirmation
-                    try:
-                        await page.wait_for_selector(reply_button_selectors[0] if reply_button_selectors else 'button:has-text("Reply")', timeout=2000, state="hidden")
-                    except:
-                        await asyncio.sleep(1)
-                    
-                    return True, f"Successfully replied to comment: {reply_text}"
-            
+                reply_el = await element.query_selector(", ".join(reply_button_selectors))
+                if reply_el and await reply_el.is_visible():
+                    reply_button = reply_el
+            except Exception:
+                pass
+        
+        for selector in (reply_button_selectors if reply_button is None else ()):
+            try:
+                reply_el = await element.query_selector(selector)
+                if reply_el and await reply_el.is_visible():
+                    reply_button = reply_el
+                    break
             except Exception:
                 continue
         
-        return False, f"Comment containing \"{comment_content[:20]}...\" not found, unable to reply"
+        if not reply_button:
+            return False, "Found comment but unable to find reply button"
+        
+        # Click reply button
+        await reply_button.click()
+        if reply_input_selectors:
+            try:
+                await page.wait_for_selector(reply_input_selectors[0], timeout=2000, state="visible")
+            except Exception:
+                pass  # Other input selectors are tried below
+        
+        # Find reply input box
+        reply_input = await find_element_by_selectors(page, reply_input_selectors, timeout=2000)
+        
+        if not reply_input:
+            return False, "Found comment but unable to locate reply input box"
+        
+        # Click input box and type
+        await reply_input.click()
+        try:
+            await page.wait_for_function(_EDITABLE_FOCUSED_JS, timeout=1000)
+        except Exception:
+            pass
+        
+        await insert_text(page, reply_text)
+        await _wait_for_submit_enabled(page, reply_submit_selectors)
+        
+        # Submit reply
+        submit_button = await find_clickable_element(page, reply_submit_selectors)
+        
+        if submit_button:
+            await submit_button.click()
+        else:
+            await page.keyboard.press('Enter')
+        
+        # Wait for confirmation
+        try:
+            await page.wait_for_selector(reply_button_selectors[0] if reply_button_selectors else 'button:has-text("Reply")', timeout=2000, state="hidden")
+        except:
+            pass
+        
+        return True, f"Successfully replied to comment: {reply_text}"
     
     except Exception as e:
         return False, f"Error replying to comment: {str(e)}"
@@ -538,6 +1219,15 @@ def clean_keywords(text: str) -> str:
     
     return text.strip()
 
+_WORD_RE = re.compile(r'\w+')
+
+# Common words dropped by extract_keywords_fallback
+_STOP_WORDS = frozenset({
+    "product", "description", "suitable", "can", "able", "has", "provide", "include", "contain",
+    "the", "a", "an", "and", "or", "but", "for", "with", "from", "this", "that", "these", "those",
+    "is", "are", "was", "were", "be", "been", "being", "have", "had", "having"
+})
+
 def extract_keywords_fallback(text: str, min_length: int = 2) -> str:
     """Extract keywords using simple fallback method (shared utility)
     
@@ -548,20 +1238,14 @@ def extract_keywords_fallback(text: str, min_length: int = 2) -> str:
     Returns:
         Space-separated keywords
     """
-    # Extract words
-    words = re.findall(r'\w+', text.lower())
-    
-    # Filter out common stop words
-    stop_words = {
-        "product", "description", "suitable", "can", "able", "has", "provide", "include", "contain",
-        "the", "a", "an", "and", "or", "but", "for", "with", "from", "this", "that", "these", "those",
-        "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", "having"
-    }
-    
-    keywords = [word for word in words if word not in stop_words and len(word) >= min_length]
-    
-    # Take first 3-5 keywords
-    keywords = keywords[:5]
+    # Take the first 5 words that are not stop words, without scanning past them
+    keywords = []
+    for match in _WORD_RE.finditer(text):
+        word = match.group().lower()
+        if word not in _STOP_WORDS and len(word) >= min_length:
+            keywords.append(word)
+            if len(keywords) == 5:
+                break
     
     if keywords:
         return " ".join(keywords)
@@ -573,35 +1257,268 @@ def extract_keywords_fallback(text: str, min_length: int = 2) -> str:
 # Shared Comment Generation Utilities (platform-agnostic)
 # ============================================================================
 
+# Domain keyword table used by detect_content_domain (order defines domain priority).
+# Immutable (domain, keywords) pairs; tuples rather than frozensets keep keyword order
+# deterministic for the compiled patterns below
+_DOMAIN_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("beauty", ("makeup", "cosmetics", "skincare", "beauty", "lipstick", "foundation", "moisturizer")),
+    ("fashion", ("fashion", "outfit", "style", "clothing", "wardrobe", "trend")),
+    ("food", ("food", "recipe", "restaurant", "cooking", "baking", "cuisine")),
+    ("travel", ("travel", "trip", "destination", "guide", "vacation", "hotel")),
+    ("parenting", ("baby", "parenting", "children", "toddler", "toys")),
+    ("tech", ("tech", "phone", "computer", "camera", "smart", "device")),
+    ("home", ("home", "decor", "furniture", "design", "interior")),
+    ("fitness", ("fitness", "workout", "exercise", "training", "gym")),
+)
+_DOMAIN_NAMES: Tuple[str, ...] = tuple(domain for domain, _ in _DOMAIN_KEYWORDS)
+
+# Domain name -> bit, and every possible mask -> domain names ("lifestyle" when empty)
+_DOMAIN_BITS: Dict[str, int] = {name: 1 << i for i, name in enumerate(_DOMAIN_NAMES)}
+_MASK_TO_DOMAINS: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(name for i, name in enumerate(_DOMAIN_NAMES) if mask >> i & 1) or ("lifestyle",)
+    for mask in range(1 << len(_DOMAIN_NAMES))
+)
+
+# One precompiled alternation per domain; a keyword matches anywhere in the text,
+# so inflections and compounds ("technology", "headphones", "homemade") count
+_DOMAIN_PATTERNS: Tuple[Tuple[int, "re.Pattern[str]"], ...] = tuple(
+    (_DOMAIN_BITS[domain], re.compile("|".join(map(re.escape, keywords))))
+    for domain, keywords in _DOMAIN_KEYWORDS
+)
+
+# Only the start of the content is scanned (and held by the memo cache); the first
+# KB almost always settles the domain
+_DOMAIN_CONTENT_HEAD = 1024
+
 def detect_content_domain(title: str, content: str) -> List[str]:
     """Detect content domain/category from title and content (shared utility)
     
     Args:
         title: Post title
-        content: Post content
+        content: Post content (only the first _DOMAIN_CONTENT_HEAD characters are used)
     
     Returns:
         List of detected domains
     """
-    domain_keywords = {
-        "beauty": ["makeup", "cosmetics", "skincare", "beauty", "lipstick", "foundation", "moisturizer"],
-        "fashion": ["fashion", "outfit", "style", "clothing", "wardrobe", "trend"],
-        "food": ["food", "recipe", "restaurant", "cooking", "baking", "cuisine"],
-        "travel": ["travel", "trip", "destination", "guide", "vacation", "hotel"],
-        "parenting": ["baby", "parenting", "children", "toddler", "toys"],
-        "tech": ["tech", "phone", "computer", "camera", "smart", "device"],
-        "home": ["home", "decor", "furniture", "design", "interior"],
-        "fitness": ["fitness", "workout", "exercise", "training", "gym"]
-    }
+    return list(_MASK_TO_DOMAINS[_detect_content_domain_mask_cached(title, content[:_DOMAIN_CONTENT_HEAD])])
+
+def count_keyword_hits(text_lower: str, keywords: Tuple[str, ...]) -> int:
+    """Count how many distinct keywords occur as substrings of text_lower (shared utility)"""
+    return sum(1 for keyword in keywords if keyword in text_lower)
+
+_ALL_DOMAINS_MASK = (1 << len(_DOMAIN_NAMES)) - 1
+
+def _scan_domain_mask(text_lower: str, mask: int = 0) -> int:
+    """Add the domains whose keywords occur in one lowered text to mask"""
+    for bit, pattern in _DOMAIN_PATTERNS:
+        if not mask & bit and pattern.search(text_lower):
+            mask |= bit
+    return mask
+
+@functools.lru_cache(maxsize=4096)
+def _detect_content_domain_mask_cached(title: str, content_head: str) -> int:
+    """Memoized domain detection returning a bitmask over _DOMAIN_NAMES"""
+    # No keyword contains a space, so title and content are scanned separately
+    # (no combined copy) and content is skipped once every domain has matched
+    mask = _scan_domain_mask(title.lower())
+    if mask != _ALL_DOMAINS_MASK:
+        mask = _scan_domain_mask(content_head.lower(), mask)
+    return mask
+
+# Detected domains for post objects that accept neither a key nor an attribute
+_POST_DOMAIN_CACHE: "weakref.WeakKeyDictionary[Any, List[str]]" = weakref.WeakKeyDictionary()
+
+def get_or_detect_domain(post: Any) -> List[str]:
+    """Detect a post's domains once, memoizing the result on post objects (shared utility)
     
-    detected_domains = []
-    text_lower = (title + " " + content).lower()
+    Args:
+        post: Post dict with "Title"/"Content" keys, or an object with title/content attributes
     
-    for domain, keywords in domain_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            detected_domains.append(domain)
+    Returns:
+        List of detected domains
+    """
+    if isinstance(post, dict):
+        # Post dicts may be shared post_cache payloads, so nothing is written into
+        # them; detection is already memoized by title and content
+        return detect_content_domain(post.get("Title", ""), post.get("Content", ""))
     
-    return detected_domains if detected_domains else ["lifestyle"]
+    domains = getattr(post, "_domain_cache", None)
+    if domains is None:
+        domains = _POST_DOMAIN_CACHE.get(post)
+    if domains is None:
+        domains = detect_content_domain(getattr(post, "title", ""), getattr(post, "content", ""))
+        try:
+            post._domain_cache = domains
+        except AttributeError:
+            _POST_DOMAIN_CACHE[post] = domains
+    return domains
+
+# Per-thread generators so concurrent workers don't contend on the global Random
+# instance; tuples are indexed with int(rand() * n) instead of random.choice
+_RNG_LOCAL = threading.local()
+
+def _rng() -> random.Random:
+    """Return the calling thread's random generator, creating it on first use"""
+    rng = getattr(_RNG_LOCAL, "rng", None)
+    if rng is None:
+        rng = _RNG_LOCAL.rng = random.Random()
+    return rng
+
+# Comment templates keyed by comment type. Each entry is (template, no_author_template);
+# the second item is None when the template does not mention the author.
+_COMMENT_TEMPLATES: Dict[str, Tuple[Tuple[str, Optional[str]], ...]] = {
+    "lead_gen": (
+        ("This {domain} share is great! I'm also researching related content, feel free to DM me~", None),
+        ("Thanks for sharing, {author}'s insights are unique! I've also compiled some related materials, interested to chat?",
+         "Thanks for sharing! I've also compiled some related materials, interested to chat?"),
+        ("Your share is very insightful! I've written similar content, feel free to reach out", None),
+        ("Really like your sharing style! I also do {domain} related content, we can follow each other", None),
+        ("Totally relate! I've encountered similar situations, DM me if you want to know more", None),
+        ("This post has so much info! Saved it, we can discuss if you have questions~", None),
+    ),
+    "like": (
+        ("Awesome! {author}'s shares are always so practical",
+         "Awesome! This is so practical"),
+        ("Every time I see {author}'s shares I learn something, keep it up!",
+         "I learn something new every time, keep it up!"),
+        ("This content is super detailed, learned a lot, thanks for sharing!", None),
+        ("Love this in-depth share, much more meaningful than typical {domain} posts", None),
+        ("Saved and upvoted, very valuable reference", None),
+        ("This kind of high-quality content is rare, thanks for sharing", None),
+    ),
+    "consult": (
+        ("Hey OP, any beginner tips for {domain}?", None),
+        ("This {domain} technique looks practical, is it suitable for beginners?", None),
+        ("OP's shared experience is so valuable, can you elaborate on how you got started?", None),
+        ("Very inspiring, would like to ask {author}, how did you reach such a professional level?",
+         "Very inspiring! How did you reach such a professional level?"),
+        ("Very interested in this field, any recommended learning resources to share?", None),
+        ("OP's insights are unique, could you share your learning path?", None),
+    ),
+    "professional": (
+        ("As a {domain} practitioner, I agree with OP's points, especially about {title_head}", None),
+        ("From a professional perspective, this share covers key points, I'd like to add...", None),
+        ("This analysis is spot on, I've found similar patterns in practice, totally agree", None),
+        ("Very professional share! I've been in related work for years, these methods really work", None),
+        ("The depth of this content is impressive, shows OP's professional expertise", None),
+        ("From a technical perspective, the methods OP shared are very feasible, worth trying", None),
+    ),
+}
+
+# Flattened parallel layout of _COMMENT_TEMPLATES (one tuple per field) so the
+# generator indexes plain tuples instead of unpacking entries on every call.
+# Author-less calls draw from their own pool with the fallback wording already
+# substituted, so no per-call author check is needed on the chosen entry.
+_TEMPLATE_NEEDS_TITLE = 0b01
+_TEMPLATE_NEEDS_AUTHOR = 0b10
+
+_TEMPLATES_WITH_AUTHOR: Dict[str, Tuple[str, ...]] = {
+    comment_type: tuple(text for text, _ in entries)
+    for comment_type, entries in _COMMENT_TEMPLATES.items()
+}
+_TEMPLATES_NO_AUTHOR: Dict[str, Tuple[str, ...]] = {
+    comment_type: tuple(fallback if fallback is not None else text for text, fallback in entries)
+    for comment_type, entries in _COMMENT_TEMPLATES.items()
+}
+_TEMPLATE_FLAGS: Dict[str, Tuple[int, ...]] = {
+    comment_type: tuple(
+        (_TEMPLATE_NEEDS_TITLE if "{title_head}" in text else 0)
+        | (_TEMPLATE_NEEDS_AUTHOR if "{author}" in text else 0)
+        for text, _ in entries
+    )
+    for comment_type, entries in _COMMENT_TEMPLATES.items()
+}
+
+@functools.lru_cache(maxsize=256)
+def _domain_templates(comment_type: str, domain: str, with_author: bool) -> Tuple[str, ...]:
+    """Templates of one type with the domain filled in; {author} and {title_head} stay open"""
+    pool = (_TEMPLATES_WITH_AUTHOR if with_author else _TEMPLATES_NO_AUTHOR)[comment_type]
+    return tuple(text.replace("{domain}", domain) for text in pool)
+
+# Domain-specific terms appended to professional comments
+_DOMAIN_TERMS: Dict[str, Tuple[str, ...]] = {
+    "beauty": ("finish", "texture", "pigmentation", "longevity", "application"),
+    "fashion": ("fit", "cut", "silhouette", "layering", "color palette"),
+    "food": ("flavor", "texture", "technique", "temperature", "seasoning"),
+    "travel": ("itinerary", "guide", "experience", "local culture", "hidden spots"),
+    "parenting": ("early education", "development", "nutrition", "interaction"),
+    "tech": ("performance", "experience", "specs", "compatibility", "efficiency"),
+    "home": ("space planning", "lighting", "color scheme", "functional areas"),
+    "fitness": ("training plan", "sets", "intensity", "recovery", "metabolism"),
+}
+
+# DM-attracting endings
+_COMMENT_ENDINGS: Tuple[str, ...] = (
+    "Feel free to DM me if you have more questions~",
+    "Check out my profile if you're interested",
+    "DM me if you want to know more",
+    "Follow me for more related content",
+    "DM me for surprises~",
+)
+
+# Suffixes with their separators baked in, so the generator only concatenates once
+_DOMAIN_TERM_SUFFIXES: Dict[str, Tuple[str, ...]] = {
+    domain: tuple(f", especially insights on {term} are unique" for term in terms)
+    for domain, terms in _DOMAIN_TERMS.items()
+}
+_ENDING_SUFFIXES: Tuple[str, ...] = tuple(" " + ending for ending in _COMMENT_ENDINGS)
+
+def _make_comment_generator(comment_type: str) -> Callable[[str, str, str], str]:
+    """Build the generator for one comment type with its pools and suffix rule pre-bound
+    
+    The returned callable takes (domain, author, title) with domain already
+    resolved to a name, and returns the finished comment.
+    """
+    flags = _TEMPLATE_FLAGS[comment_type]
+    count = len(_TEMPLATES_WITH_AUTHOR[comment_type])
+    endings = _ENDING_SUFFIXES
+    ending_count = len(endings)
+    
+    def fill(rand, domain: str, author: str, title: str) -> str:
+        # Templates come with the domain already filled in (cached per domain); only
+        # the author and title placeholders the chosen template uses are substituted
+        index = int(rand() * count)
+        text = _domain_templates(comment_type, domain, bool(author))[index]
+        flag = flags[index]
+        if flag & _TEMPLATE_NEEDS_TITLE:
+            return text.format(author=author, title_head=title[:10] or "this")
+        if flag & _TEMPLATE_NEEDS_AUTHOR and author:
+            return text.format(author=author)
+        return text
+    
+    if comment_type == "professional":
+        # Add domain-specific terms for professional comments
+        def generate(domain: str, author: str, title: str) -> str:
+            rand = _rng().random
+            text = fill(rand, domain, author, title)
+            term_suffixes = _DOMAIN_TERM_SUFFIXES.get(domain)
+            if term_suffixes and rand() > 0.5:
+                text += term_suffixes[int(rand() * len(term_suffixes))]
+            return text
+    elif comment_type == "lead_gen":
+        # Lead generation comments always end with a DM-attracting line
+        def generate(domain: str, author: str, title: str) -> str:
+            rand = _rng().random
+            return fill(rand, domain, author, title) + endings[int(rand() * ending_count)]
+    elif comment_type == "consult":
+        # Consult comments sometimes end with a DM-attracting line
+        def generate(domain: str, author: str, title: str) -> str:
+            rand = _rng().random
+            text = fill(rand, domain, author, title)
+            if rand() > 0.7:
+                text += endings[int(rand() * ending_count)]
+            return text
+    else:
+        def generate(domain: str, author: str, title: str) -> str:
+            return fill(_rng().random, domain, author, title)
+    
+    return generate
+
+# Comment type -> generator; unknown types fall back to lead generation
+_COMMENT_GENERATORS: Dict[str, Callable[[str, str, str], str]] = {
+    comment_type: _make_comment_generator(comment_type) for comment_type in _COMMENT_TEMPLATES
+}
+_DEFAULT_COMMENT_GENERATOR = _COMMENT_GENERATORS["lead_gen"]
 
 def generate_comment_template(
     comment_type: str,
@@ -622,99 +1539,54 @@ def generate_comment_template(
     Returns:
         Generated comment text
     """
-    templates = {
-        "lead_gen": [
-            f"This {domain} share is great! I'm also researching related content, feel free to DM me~",
-            f"Thanks for sharing, {author}'s insights are unique! I've also compiled some related materials, interested to chat?" if author else "Thanks for sharing! I've also compiled some related materials, interested to chat?",
-            f"Your share is very insightful! I've written similar content, feel free to reach out",
-            f"Really like your sharing style! I also do {domain} related content, we can follow each other",
-            f"Totally relate! I've encountered similar situations, DM me if you want to know more",
-            f"This post has so much info! Saved it, we can discuss if you have questions~"
-        ],
-        "like": [
-            f"Awesome! {author}'s shares are always so practical" if author else "Awesome! This is so practical",
-            f"Every time I see {author}'s shares I learn something, keep it up!" if author else "I learn something new every time, keep it up!",
-            f"This content is super detailed, learned a lot, thanks for sharing!",
-            f"Love this in-depth share, much more meaningful than typical {domain} posts",
-            f"Saved and upvoted, very valuable reference",
-            f"This kind of high-quality content is rare, thanks for sharing"
-        ],
-        "consult": [
-            f"Hey OP, any beginner tips for {domain}?",
-            f"This {domain} technique looks practical, is it suitable for beginners?",
-            f"OP's shared experience is so valuable, can you elaborate on how you got started?",
-            f"Very inspiring, would like to ask {author}, how did you reach such a professional level?" if author else "Very inspiring! How did you reach such a professional level?",
-            f"Very interested in this field, any recommended learning resources to share?",
-            f"OP's insights are unique, could you share your learning path?"
-        ],
-        "professional": [
-            f"As a {domain} practitioner, I agree with OP's points, especially about {title[:10] if title else 'this'}",
-            f"From a professional perspective, this share covers key points, I'd like to add...",
-            f"This analysis is spot on, I've found similar patterns in practice, totally agree",
-            f"Very professional share! I've been in related work for years, these methods really work",
-            f"The depth of this content is impressive, shows OP's professional expertise",
-            f"From a technical perspective, the methods OP shared are very feasible, worth trying"
-        ]
-    }
-    
-    if comment_type not in templates:
-        comment_type = "lead_gen"
-    
-    selected_template = random.choice(templates[comment_type])
-    
-    # Add domain-specific terms for professional comments
-    if comment_type == "professional":
-        domain_terms = {
-            "beauty": ["finish", "texture", "pigmentation", "longevity", "application"],
-            "fashion": ["fit", "cut", "silhouette", "layering", "color palette"],
-            "food": ["flavor", "texture", "technique", "temperature", "seasoning"],
-            "travel": ["itinerary", "guide", "experience", "local culture", "hidden spots"],
-            "parenting": ["early education", "development", "nutrition", "interaction"],
-            "tech": ["performance", "experience", "specs", "compatibility", "efficiency"],
-            "home": ["space planning", "lighting", "color scheme", "functional areas"],
-            "fitness": ["training plan", "sets", "intensity", "recovery", "metabolism"]
-        }
-        
-        if domain in domain_terms and random.random() > 0.5:
-            selected_term = random.choice(domain_terms[domain])
-            selected_template += f", especially insights on {selected_term} are unique"
-    
-    # Add DM-attracting endings
-    if comment_type == "lead_gen" or (comment_type == "consult" and random.random() > 0.7):
-        endings = [
-            "Feel free to DM me if you have more questions~",
-            "Check out my profile if you're interested",
-            "DM me if you want to know more",
-            "Follow me for more related content",
-            "DM me for surprises~"
-        ]
-        selected_template += " " + random.choice(endings)
-    
-    return selected_template
+    return _COMMENT_GENERATORS.get(comment_type, _DEFAULT_COMMENT_GENERATOR)(domain, author, title)
 
 # Export shared utilities
 __all__ = [
+    'configure_logging',
     'ensure_browser',
+    'save_browser_state',
+    'STORAGE_STATE_PATH',
     '_call_llm',
+    '_call_llm_multi',
+    'run_on_browser_loop',
+    'on_browser_loop',
     'browser_context',
     'main_page',
     'is_logged_in',  # For backward compatibility
     'BROWSER_DATA_DIR',
     'DATA_DIR',
+    # Concurrent scraping
+    'PagePool',
+    'get_page_pool',
+    # Scrape cache
+    'canonicalize_url',
+    'ScrapeCache',
+    'post_cache',
+    'search_cache',
+    'intent_cache',
+    'POST_CACHE_TTL',
+    'SEARCH_CACHE_TTL',
     # Playwright helpers
     'find_element_by_selectors',
     'find_clickable_element',
+    'get_text_by_selectors',
+    'get_texts_by_selectors',
+    'insert_text',
     'type_and_submit_comment',
     'find_and_reply_to_comment',
     # Text processing
     'clean_keywords',
     'extract_keywords_fallback',
+    'count_keyword_hits',
     # Comment generation
     'detect_content_domain',
+    'get_or_detect_domain',
     'generate_comment_template',
 ]
 
 if __name__ == "__main__":
+    configure_logging()
     # Initialize and run MCP server (for backward compatibility)
     print("Starting MCP server...")
     print("Note: Platform-specific functions have been moved to platform classes.")
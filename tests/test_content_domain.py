@@ -0,0 +1,34 @@
+"""Domain detection must not depend on text length"""
+from service_mcp import detect_content_domain
+
+PADDING = " lorem" * 120  # Pushes the text well past the old 512-character cutoff
+
+
+def test_plurals_and_compounds_match():
+    assert detect_content_domain("Hotels / recipes workouts smartphone", "") == ["food", "travel", "tech", "fitness"]
+
+
+def test_inflected_forms_match():
+    assert detect_content_domain("Technology trends", "") == ["fashion", "tech"]
+    assert detect_content_domain("travelling", "") == ["travel"]
+    assert detect_content_domain("travelers", "") == ["travel"]
+    assert detect_content_domain("homemade decorations", "") == ["home"]
+
+
+def test_compound_words_match():
+    for word in ("headphones", "earphones", "smartwatch"):
+        assert detect_content_domain(word, "") == ["tech"]
+    assert detect_content_domain("hairstyle", "") == ["fashion"]
+
+
+def test_keywords_inside_words_match():
+    assert detect_content_domain("My hometown lifestyle", PADDING) == ["fashion", "home"]
+
+
+def test_same_domains_for_short_and_long_text():
+    for title in ("Hotels / recipes workouts smartphone", "My hometown lifestyle", "Technology trends", "best gym shoes?"):
+        assert detect_content_domain(title, "") == detect_content_domain(title, PADDING)
+
+
+def test_no_keyword_is_lifestyle():
+    assert detect_content_domain("Weekend thoughts", PADDING) == ["lifestyle"]